@@ -0,0 +1,136 @@
+"""
+Compile a fitted sklearn decision tree into dependency-free Python that can
+be pasted into a Trader: either a nested if/else function or a compact
+threshold-array evaluator. Running this file fits a tree on the round 2
+days, checks both compiled forms against model.predict on every training
+row and prints them.
+
+sklearn compares float32 copies of the features against float64
+thresholds, the compiled code compares the raw floats, so an input within
+a float32 rounding of a threshold could in principle land on the other side.
+"""
+
+import re
+import sys
+from typing import List
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+LEAF = -1
+
+
+def identifier(name: str) -> str:
+    return re.sub(r"\W", "_", name).lower()
+
+
+def leaf_values(model) -> List[float]:
+    """The prediction at every node: a class label or the mean target."""
+    values = model.tree_.value[:, 0, :]
+    if isinstance(model, DecisionTreeClassifier):
+        return [model.classes_[i].item() for i in values.argmax(axis=1)]
+    return [float(value) for value in values[:, 0]]
+
+
+def compile_function(model, feature_names: List[str], name: str) -> str:
+    """Source of `def name(<features>)` as nested comparisons."""
+    tree = model.tree_
+    values = leaf_values(model)
+    arguments = [identifier(feature) for feature in feature_names]
+    lines = [f"def {name}({', '.join(arguments)}):"]
+
+    def emit(node: int, depth: int) -> None:
+        indent = "    " * depth
+        if tree.children_left[node] == LEAF:
+            lines.append(f"{indent}return {values[node]!r}")
+            return
+        argument = arguments[tree.feature[node]]
+        lines.append(f"{indent}if {argument} <= {float(tree.threshold[node])!r}:")
+        emit(tree.children_left[node], depth + 1)
+        lines.append(f"{indent}else:")
+        emit(tree.children_right[node], depth + 1)
+
+    emit(0, 1)
+    return "\n".join(lines) + "\n"
+
+
+def compile_arrays(model, feature_names: List[str], name: str) -> str:
+    """
+    Source of a `NAME` constant holding the tree as flat lists and
+    `def name(features)` that walks it, features given in feature_names order.
+    """
+    tree = model.tree_
+    constant = name.upper()
+    arrays = {
+        "feature": [int(feature) for feature in tree.feature],
+        "threshold": [float(threshold) for threshold in tree.threshold],
+        "left": [int(node) for node in tree.children_left],
+        "right": [int(node) for node in tree.children_right],
+        "value": leaf_values(model),
+    }
+    lines = [f"# features: {', '.join(feature_names)}", f"{constant} = {{"]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in arrays.items())
+    lines.extend(
+        [
+            "}",
+            "",
+            "",
+            f"def {name}(features):",
+            f"    feature = {constant}['feature']",
+            f"    threshold = {constant}['threshold']",
+            f"    left = {constant}['left']",
+            f"    right = {constant}['right']",
+            "    node = 0",
+            f"    while left[node] != {LEAF}:",
+            "        if features[feature[node]] <= threshold[node]:",
+            "            node = left[node]",
+            "        else:",
+            "            node = right[node]",
+            f"    return {constant}['value'][node]",
+        ]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def load_compiled(source: str, name: str):
+    namespace = {}
+    exec(source, namespace)
+    return namespace[name]
+
+
+def check_parity(model, feature_names: List[str], X: np.ndarray) -> int:
+    """Compile both forms and count the rows where either disagrees with sklearn."""
+    expected = model.predict(X)
+    nested = load_compiled(compile_function(model, feature_names, "nested"), "nested")
+    arrays = load_compiled(compile_arrays(model, feature_names, "walk"), "walk")
+    mismatches = 0
+    for row, prediction in zip(X.tolist(), expected.tolist()):
+        if nested(*row) != prediction or arrays(row) != prediction:
+            mismatches += 1
+    return mismatches
+
+
+if __name__ == "__main__":
+    from feature_store import DAYS, load_days
+
+    features = ["ORCHIDS_lag_1", "SUNLIGHT", "HUMIDITY", "EXPORT_TARIFF"]
+    data = load_days(DAYS, lags=1)
+    X = data[features].to_numpy()
+    rising = (data["NextDayOrchids"] > data["ORCHIDS"]).astype(int).to_numpy()
+
+    failed = False
+    for model, y in (
+        (DecisionTreeClassifier(max_depth=4, random_state=0), rising),
+        (DecisionTreeRegressor(max_depth=6, random_state=0), data["PriceChange"]),
+    ):
+        model.fit(X, y)
+        mismatches = check_parity(model, features, X)
+        failed = failed or mismatches > 0
+        print(
+            f"{type(model).__name__} depth {model.get_depth()}: "
+            f"{mismatches} of {len(X)} training rows differ from model.predict"
+        )
+
+    print()
+    print(compile_function(model, features, "orchid_price_change"))
+    sys.exit(1 if failed else 0)
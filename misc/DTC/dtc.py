@@ -1,33 +1,34 @@
-import pandas as pd
+from feature_store import cross_validate, load_features
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeRegressor, export_text
 
-# Load your data
-data = pd.read_csv("round2-data-bottle/prices_round_2_day_-1.csv", delimiter=";")
-
-# Calculate the change in Orchids price and set up the target variable
-data["PriceChange"] = data["ORCHIDS"].diff().shift(-1)  # Predict next day's change
-
-# Drop rows with NaN values immediately after creating 'PriceChange' to ensure alignment
-data.dropna(subset=["PriceChange", "SUNLIGHT", "HUMIDITY", "ORCHIDS"], inplace=True)
-
-# Prepare data (ensure 'ORCHIDS' lags to avoid look-ahead bias)
-data["ORCHIDS_lag"] = data["ORCHIDS"].shift(1)
-X = data[["SUNLIGHT", "HUMIDITY", "ORCHIDS_lag"]]  # Using lagged Orchids price
+# Day -1 with the ORCHIDS price lagged by one tick (to avoid look-ahead bias),
+# PriceChange is the next tick's change
+data = load_features(-1, lags=1)
+
+# Pick the depth and features with forward-chaining cross-validation
+feature_sets = {
+    "weather": ["SUNLIGHT", "HUMIDITY"],
+    "weather + lag": ["SUNLIGHT", "HUMIDITY", "ORCHIDS_lag_1"],
+}
+scores = cross_validate(data, feature_sets, depths=range(2, 9))
+print(scores.to_string(index=False))
+best = scores.iloc[0]
+features = feature_sets[best["features"]]
+
+X = data[features]
 y = data["PriceChange"]
 
-# Split data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+# Hold out the last 20% of the day, the test rows come after the training rows
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
 
 # Initialize and train the decision tree regressor
-tree = DecisionTreeRegressor(max_depth=3)  # Limit depth for simpler rules
+tree = DecisionTreeRegressor(max_depth=int(best["max_depth"]))
 tree.fit(X_train, y_train)
 
 # Extract rules from the trained decision tree
-tree_rules = export_text(tree, feature_names=["SUNLIGHT", "HUMIDITY", "ORCHIDS_lag"])
+tree_rules = export_text(tree, feature_names=features)
 print(tree_rules)
 
 # Make predictions
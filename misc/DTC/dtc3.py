@@ -1,54 +1,44 @@
-import pandas as pd
+import time
+
+from evaluate import equity_curve, signal_positions
+from feature_store import cross_validate, lag_columns, load_features
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeRegressor, export_text
 
-# Load and prepare the data
-data = pd.read_csv("round2-data-bottle/prices_round_2_day_-1.csv", delimiter=";")
-
-# Generating lagged features
+# Day -1 with 4 lags of every observation and the next tick's PriceChange
 lags = 4
-for col in [
-    "ORCHIDS",
-    "SUNLIGHT",
-    "HUMIDITY",
-    "TRANSPORT_FEES",
-    "EXPORT_TARIFF",
-    "IMPORT_TARIFF",
-]:
-    for lag in range(1, lags + 1):
-        data[f"{col}_lag_{lag}"] = data[col].shift(lag)
-
-# Calculate the PriceChange as the target variable
-data["NextDayOrchids"] = data["ORCHIDS"].shift(-1)
-data["PriceChange"] = data["NextDayOrchids"] - data["ORCHIDS"]
-
-# Drop rows with NaN values resulting from shifts
-data.dropna(inplace=True)
+data = load_features(-1, lags)
+
+# Pick the depth and features with forward-chaining cross-validation
+feature_sets = {
+    "orchids": lag_columns(["ORCHIDS"], lags),
+    "weather": lag_columns(["ORCHIDS", "SUNLIGHT", "HUMIDITY"], lags),
+    "all": lag_columns(
+        [
+            "ORCHIDS",
+            "SUNLIGHT",
+            "HUMIDITY",
+            "TRANSPORT_FEES",
+            "EXPORT_TARIFF",
+            "IMPORT_TARIFF",
+        ],
+        lags,
+    ),
+}
+scores = cross_validate(data, feature_sets, depths=range(2, 9))
+print(scores.to_string(index=False))
+best = scores.iloc[0]
+features = feature_sets[best["features"]]
 
-# Define features and target
-features = [
-    f"{col}_lag_{lag}"
-    for col in [
-        "ORCHIDS",
-        "SUNLIGHT",
-        "HUMIDITY",
-        "TRANSPORT_FEES",
-        "EXPORT_TARIFF",
-        "IMPORT_TARIFF",
-    ]
-    for lag in range(1, lags + 1)
-]
 X = data[features]
 y = data["PriceChange"]
 
-# Split data into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+# Hold out the last 20% of the day, the test rows come after the training rows
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
 
 # Initialize and train the Decision Tree Regressor
-model = DecisionTreeRegressor(max_depth=5)
+model = DecisionTreeRegressor(max_depth=int(best["max_depth"]))
 model.fit(X_train, y_train)
 
 # Evaluate the model
@@ -67,23 +57,10 @@ print("Decision Rules from Decision Tree:")
 print(rule_text)
 
 
-# Simulate trading
-capital = 1000
-current_holdings = 0
-transaction_costs = 0
-
-for index, row in data.iterrows():
-    row_df = pd.DataFrame([row[features]], columns=features)
-    predicted_change = model.predict(row_df)[0]
-
-    target_holdings = 100 if predicted_change > 0 else -100
-    change_in_holdings = target_holdings - current_holdings
-    capital -= abs(change_in_holdings) * transaction_costs
-    current_holdings = target_holdings
-
-    if index < len(data) - 1:
-        capital += current_holdings * (
-            data.iloc[index + 1]["ORCHIDS"] - data.iloc[index]["ORCHIDS"]
-        )
+# Simulate trading: hold +-100 on the predicted direction of the next change
+start = time.perf_counter()
+positions = signal_positions(model.predict(X))
+equity = equity_curve(data["ORCHIDS"], positions, limit=100, cost=0, capital=1000)
+elapsed = (time.perf_counter() - start) * 1000
 
-print(f"Final capital after trading: {capital:.2f}")
+print(f"Final capital after trading: {equity[-1]:.2f} ({elapsed:.1f}ms)")
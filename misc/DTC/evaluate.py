@@ -0,0 +1,35 @@
+"""
+Vectorized PnL for the DTC research: turn a whole prediction vector (one
+model.predict(X) call) or any target position series into an equity curve.
+"""
+
+import numpy as np
+
+
+def signal_positions(signal, size: int = 100) -> np.ndarray:
+    """Long `size` where the signal is positive, short `size` otherwise."""
+    return np.where(np.asarray(signal) > 0, size, -size)
+
+
+def equity_curve(
+    prices,
+    positions,
+    limit: int | None = None,
+    cost: float = 0.0,
+    capital: float = 0.0,
+    initial_position: int = 0,
+) -> np.ndarray:
+    """
+    Capital after each tick when holding positions[i] from price[i] to
+    price[i + 1]. Positions are clipped to +-limit and every unit traded
+    pays `cost`. The last position is marked but never held.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if limit is not None:
+        positions = np.clip(positions, -limit, limit)
+
+    traded = np.abs(np.diff(positions, prepend=initial_position))
+    pnl = np.zeros(len(prices))
+    pnl[:-1] = positions[:-1] * np.diff(prices)
+    return capital + np.cumsum(pnl - traded * cost)
@@ -0,0 +1,152 @@
+"""
+Lagged ORCHIDS features for the decision tree research, computed once per
+round 2 day from the tick store and cached on disk per (day, lags), plus a
+parallel time-series cross-validation over tree depth and feature sets.
+"""
+
+import itertools
+import os
+import sys
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src")
+)
+from tickstore import OBSERVATION_COLUMNS, STORE_DIR, load_day, store_paths
+
+ROUND = 2
+DAYS = [-1, 0, 1]
+COLUMNS = OBSERVATION_COLUMNS  # ORCHIDS, TRANSPORT_FEES, ..., SUNLIGHT, HUMIDITY
+
+
+def lag_columns(columns: Sequence[str], lags: int) -> List[str]:
+    return [f"{column}_lag_{lag}" for column in columns for lag in range(1, lags + 1)]
+
+
+def build_features(day: int, lags: int) -> pd.DataFrame:
+    observations = load_day(ROUND, day).observations
+    values = {"timestamp": np.asarray(observations["timestamp"], dtype=np.int64)}
+    for column in COLUMNS:
+        values[column] = np.asarray(observations[column.lower()], dtype=np.float64)
+
+    n = len(values["timestamp"])
+    for column in COLUMNS:
+        for lag in range(1, lags + 1):
+            lagged = np.full(n, np.nan)
+            lagged[lag:] = values[column][:-lag]
+            values[f"{column}_lag_{lag}"] = lagged
+
+    next_orchids = np.full(n, np.nan)
+    next_orchids[:-1] = values["ORCHIDS"][1:]
+    values["NextDayOrchids"] = next_orchids
+    values["PriceChange"] = next_orchids - values["ORCHIDS"]
+
+    # rows without a full lag history or a next price are dropped
+    frame = pd.DataFrame(values)
+    return frame.iloc[lags : n - 1].reset_index(drop=True)
+
+
+def cache_path(day: int, lags: int) -> str:
+    return os.path.join(STORE_DIR, f"features_round_{ROUND}_day_{day}_lags_{lags}.npz")
+
+
+def load_features(day: int, lags: int = 1) -> pd.DataFrame:
+    """
+    One day's observations with `{column}_lag_{k}` for k = 1..lags, the next
+    ORCHIDS price and the PriceChange target, rebuilt if the cache is older
+    than the day's tick store.
+    """
+    path = cache_path(day, lags)
+    index = store_paths(ROUND, day)["index"]
+    if (
+        os.path.exists(path)
+        and os.path.exists(index)
+        and os.path.getmtime(path) >= os.path.getmtime(index)
+    ):
+        with np.load(path) as archive:
+            return pd.DataFrame({name: archive[name] for name in archive.files})
+
+    frame = build_features(day, lags)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    np.savez(path, **{name: frame[name].to_numpy() for name in frame.columns})
+    return frame
+
+
+def load_days(days: Sequence[int] = DAYS, lags: int = 1) -> pd.DataFrame:
+    """Several days in time order, lags never reach across a day boundary."""
+    frames = [load_features(day, lags).assign(day=day) for day in days]
+    return pd.concat(frames, ignore_index=True)
+
+
+def score_candidate(
+    X: np.ndarray,
+    y: np.ndarray,
+    depth: int,
+    classifier: bool,
+    splits: int,
+) -> Dict[str, float]:
+    scores = []
+    for train, test in TimeSeriesSplit(n_splits=splits).split(X):
+        model_class = DecisionTreeClassifier if classifier else DecisionTreeRegressor
+        model = model_class(max_depth=depth, random_state=0)
+        model.fit(X[train], y[train])
+        predictions = model.predict(X[test])
+        if classifier:
+            scores.append([accuracy_score(y[test], predictions)])
+        else:
+            scores.append(
+                [
+                    mean_squared_error(y[test], predictions),
+                    mean_absolute_error(y[test], predictions),
+                ]
+            )
+
+    means = np.mean(scores, axis=0)
+    if classifier:
+        return {"accuracy": float(means[0])}
+    return {"mse": float(means[0]), "mae": float(means[1])}
+
+
+def cross_validate(
+    data: pd.DataFrame,
+    feature_sets: Dict[str, List[str]],
+    depths: Sequence[int],
+    target: str = "PriceChange",
+    classifier: bool = False,
+    splits: int = 5,
+    workers: int = -1,
+) -> pd.DataFrame:
+    """
+    Score every (feature set, depth) with forward-chaining TimeSeriesSplit
+    folds over the rows of `data` in time order, in parallel. Returns one
+    row per candidate, best first.
+    """
+    y = data[target].to_numpy()
+    candidates = list(itertools.product(feature_sets, depths))
+    results = Parallel(n_jobs=workers)(
+        delayed(score_candidate)(
+            data[feature_sets[name]].to_numpy(), y, depth, classifier, splits
+        )
+        for name, depth in candidates
+    )
+
+    rows = [
+        {"features": name, "max_depth": depth, **scores}
+        for (name, depth), scores in zip(candidates, results)
+    ]
+    key = "accuracy" if classifier else "mse"
+    return pd.DataFrame(rows).sort_values(key, ascending=not classifier)
+
+
+if __name__ == "__main__":
+    for lags in (1, 4):
+        for day in DAYS:
+            frame = load_features(day, lags)
+            print(f"round {ROUND} day {day}, {lags} lags: {frame.shape}")
@@ -1,82 +1,62 @@
 # AUTHOR: ARMAAN KAPOOR
 # Imc-Prosperity-2024 Visualizer
-# Replace ```14: log_path``` with the path to a valid log file.
+# Pass a log file or a directory of logs (default: submissions/). Parsed logs
+# are cached by content hash and several runs can be overlaid.
+# Figures are built in callbacks from the visible x-range, downsampled to
+# MAX_POINTS per trace and redrawn at full resolution once zoomed in that far.
 
-import re
-from io import StringIO
+import argparse
+import os
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, dcc, html
-from plotly.subplots import make_subplots
+from dash import MATCH, Dash, Input, Output, State, ctx, dcc, html
+from dash.exceptions import PreventUpdate
 
-log_path = (
-    "/Users/armaan/Desktop/imc-prosperity-quant-nyc/submissions/2024-04-15_02-18-46.log"
+from downsample import changes_x, downsample, relayout_range, visible_slice
+from logcache import load_log, log_paths
+
+DEFAULT_LOGS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "submissions"
 )
 
+colors = {
+    "AMETHYSTS": "blue",
+    "STARFRUIT": "purple",
+    "ORCHIDS": "green",
+    "CHOCOLATE": "saddlebrown",
+    "STRAWBERRIES": "crimson",
+    "ROSES": "deeppink",
+    "GIFT_BASKET": "darkorange",
+}
+run_colors = px.colors.qualitative.Plotly
+
+
+def trace_color(frames, i, line_color):
+    # the product's colour for a single run, one colour per run when overlaid
+    return line_color if len(frames) == 1 else run_colors[i % len(run_colors)]
 
-def read_file_sections(filepath):
-    section_delimiters = ["Sandbox logs:", "Activities log:", "Trade History:"]
-    current_section = None
-    data = {key: [] for key in section_delimiters}
-
-    with open(filepath, "r") as file:
-        for line in file:
-            line = line.strip()
-            if line in section_delimiters:
-                current_section = line
-                continue
-            if current_section:
-                data[current_section].append(line)
-
-    return data
-
-
-def extract_trades(text):
-    # Regex to find all blocks enclosed in curly braces
-    trade_pattern = r"\{[^{}]*\}"
-    # Regex to extract key-value pairs within curly braces
-    kv_pattern = r"\"(\w+)\":\s*(\"[^\"]*\"|\d+)"
-
-    trades = []
-    matches = re.findall(trade_pattern, text)
-    for match in matches:
-        trade_data = {}
-        for key, value in re.findall(kv_pattern, match):
-            if value.startswith('"') and value.endswith('"'):
-                value = value.strip('"')
-            else:
-                value = int(value)
-            trade_data[key] = value
-        trades.append(trade_data)
-    return trades
-
-
-sections = read_file_sections(log_path)
-activities_data = "\n".join(sections["Activities log:"])
-activities_df = pd.read_csv(StringIO(activities_data), delimiter=";")
-trade_history_text = "\n".join(sections["Trade History:"])
-trades = extract_trades(trade_history_text)
-trade_history_df = pd.DataFrame(trades)
-
-
-amethysts_df = activities_df[activities_df["product"] == "AMETHYSTS"]
-starfruit_df = activities_df[activities_df["product"] == "STARFRUIT"]
-orchids_df = activities_df[activities_df["product"] == "ORCHIDS"]
-
-
-def plot_pnl(df, product_name, line_color):
-    fig = px.line(
-        df,
-        x="timestamp",
-        y="profit_and_loss",
+
+def plot_pnl(frames, product_name, line_color, x_range=None):
+    fig = go.Figure()
+    for i, (run_name, df) in enumerate(frames):
+        x, y = downsample(df["timestamp"], df["profit_and_loss"], x_range)
+        color = trace_color(frames, i, line_color)
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=y,
+                mode="lines+markers",
+                line=dict(color=color),
+                marker=dict(size=5, color=color),
+                name=run_name,
+            )
+        )
+    fig.update_layout(
         title=f"Profit and Loss Over Time for {product_name}",
-        labels={"timestamp": "Timestamp", "profit_and_loss": "Profit and Loss"},
         template="plotly_white",
-        color_discrete_sequence=[line_color],
-    )
-    fig.update_layout(
         xaxis_title="Timestamp",
         yaxis_title="Profit and Loss",
         legend_title="Legend",
@@ -84,30 +64,18 @@ def plot_pnl(df, product_name, line_color):
         xaxis=dict(tickangle=-45),
         hovermode="x",
     )
-    fig.update_traces(mode="lines+markers", marker=dict(size=5, color=line_color))
     return fig
 
 
-colors = {"AMETHYSTS": "blue", "STARFRUIT": "purple", "ORCHIDS": "green"}
-
-fig_amethysts_pnl = plot_pnl(amethysts_df, "AMETHYSTS", colors["AMETHYSTS"])
-fig_starfruit_pnl = plot_pnl(starfruit_df, "STARFRUIT", colors["STARFRUIT"])
-fig_orchids_pnl = plot_pnl(orchids_df, "ORCHIDS", colors["ORCHIDS"])
-
-
-amethysts_df = activities_df[activities_df["product"] == "AMETHYSTS"]
-starfruit_df = activities_df[activities_df["product"] == "STARFRUIT"]
-orchids_df = activities_df[activities_df["product"] == "ORCHIDS"]
-
-
-def plot_product_prices(df, product_name, line_color):
+def plot_product_prices(df, product_name, line_color, x_range=None):
     fig = go.Figure()
 
     # Add mid price line
+    x, y = downsample(df["timestamp"], df["mid_price"], x_range)
     fig.add_trace(
         go.Scatter(
-            x=df["timestamp"],
-            y=df["mid_price"],
+            x=x,
+            y=y,
             mode="lines",
             line=dict(color=line_color),
             name="Mid Price",
@@ -115,10 +83,11 @@ def plot_product_prices(df, product_name, line_color):
     )
 
     # Add bid price markers
+    x, y = downsample(df["timestamp"], df["bid_price_1"], x_range, method="minmax")
     fig.add_trace(
         go.Scatter(
-            x=df["timestamp"],
-            y=df["bid_price_1"],
+            x=x,
+            y=y,
             mode="markers",
             marker=dict(color="green", size=7),
             name="Bid Price",
@@ -126,10 +95,11 @@ def plot_product_prices(df, product_name, line_color):
     )
 
     # Add ask price markers
+    x, y = downsample(df["timestamp"], df["ask_price_1"], x_range, method="minmax")
     fig.add_trace(
         go.Scatter(
-            x=df["timestamp"],
-            y=df["ask_price_1"],
+            x=x,
+            y=y,
             mode="markers",
             marker=dict(color="red", size=7, symbol="x"),
             name="Ask Price",
@@ -147,17 +117,7 @@ def plot_product_prices(df, product_name, line_color):
     return fig
 
 
-fig_price_trends_amethysts = plot_product_prices(amethysts_df, "AMETHYSTS", "blue")
-fig_price_trends_starfruit = plot_product_prices(starfruit_df, "STARFRUIT", "purple")
-fig_price_trends_orchids = plot_product_prices(orchids_df, "ORCHIDS", "green")
-
-
-amethysts_df = activities_df[activities_df["product"] == "AMETHYSTS"]
-starfruit_df = activities_df[activities_df["product"] == "STARFRUIT"]
-orchids_df = activities_df[activities_df["product"] == "ORCHIDS"]
-
-
-def plot_bid_prices_volumes_dual_axis(df, product_name):
+def plot_bid_prices_volumes_dual_axis(df, product_name, line_color, x_range=None):
     colors = [
         {"price": "darkblue", "volume": "lightblue"},
         {"price": "darkgreen", "volume": "lightgreen"},
@@ -172,20 +132,22 @@ def plot_bid_prices_volumes_dual_axis(df, product_name):
         bid_volume_col = f"bid_volume_{i}"
 
         if bid_price_col in df.columns and bid_volume_col in df.columns:
+            x, y = downsample(df["timestamp"], df[bid_price_col], x_range)
             fig.add_trace(
                 go.Scatter(
-                    x=df["timestamp"],
-                    y=df[bid_price_col],
+                    x=x,
+                    y=y,
                     name=f"Bid Price {i} - {product_name}",
                     yaxis="y1",
                     line=dict(color=colors[i - 1]["price"], width=2),
                 )
             )
 
+            x, y = downsample(df["timestamp"], df[bid_volume_col], x_range)
             fig.add_trace(
                 go.Scatter(
-                    x=df["timestamp"],
-                    y=df[bid_volume_col],
+                    x=x,
+                    y=y,
                     name=f"Volume for Bid Price {i} - {product_name}",
                     yaxis="y2",
                     fill="tozeroy",
@@ -214,219 +176,251 @@ def plot_bid_prices_volumes_dual_axis(df, product_name):
     return fig
 
 
-fig_bid_prices_volumes_amethysts = plot_bid_prices_volumes_dual_axis(
-    amethysts_df, "AMETHYSTS"
-)
-fig_bid_prices_volumes_starfruit = plot_bid_prices_volumes_dual_axis(
-    starfruit_df, "STARFRUIT"
-)
-fig_bid_prices_volumes_orchids = plot_bid_prices_volumes_dual_axis(
-    orchids_df, "ORCHIDS"
-)
+def prepare_ticker_data(trade_history_df, activities_df):
+    # One outer merge of every symbol's fills onto its activities rows
+    trades_df = trade_history_df.rename(columns={"symbol": "product"})
+    merged_df = pd.merge(
+        activities_df[["product", "timestamp", "mid_price"]],
+        trades_df[["product", "timestamp", "buyer", "seller", "price", "quantity"]],
+        on=["product", "timestamp"],
+        how="outer",
+    )
+    merged_df = merged_df[merged_df["product"].isin(trades_df["product"].unique())]
+    merged_df = merged_df.sort_values(["product", "timestamp"], kind="stable")
+
+    # Signed quantities: +quantity for our buys, -quantity for our sells
+    quantity = merged_df["quantity"].fillna(0).to_numpy()
+    side = np.where(
+        merged_df["buyer"].to_numpy() == "SUBMISSION",
+        1,
+        np.where(merged_df["seller"].to_numpy() == "SUBMISSION", -1, 0),
+    )
+    merged_df["side"] = side
+    merged_df["signed_quantity"] = side * quantity
 
+    # Calculate cumulative holdings over time per symbol
+    merged_df["cumulative_holdings"] = merged_df.groupby("product")[
+        "signed_quantity"
+    ].cumsum()
 
-def prepare_ticker_plots(trade_history_df, activities_df):
-    unique_tickers = trade_history_df["symbol"].unique()
-    figures = {}  # Dictionary to store figures
+    return {
+        symbol: df.reset_index(drop=True)
+        for symbol, df in merged_df.groupby("product", sort=False)
+    }
 
-    for symbol in unique_tickers:
-        # Filter data for the specific ticker
-        ticker_trade_history_df = trade_history_df[trade_history_df["symbol"] == symbol]
-        ticker_activities_df = activities_df[activities_df["product"] == symbol]
 
-        # Merge the trade history with the activities data on timestamps
-        merged_df = pd.merge(
-            ticker_activities_df, ticker_trade_history_df, on="timestamp", how="outer"
-        )
-
-        # Create the plot
-        fig = go.Figure()
+def plot_trades_made(frames, symbol, line_color, x_range=None):
+    fig = go.Figure()
 
-        # Add the mid_price line
-        fig.add_trace(
-            go.Scatter(
-                x=merged_df["timestamp"],
-                y=merged_df["mid_price"],
-                mode="lines",
-                name="Mid Price",
-                line=dict(color="blue"),
-            )
+    # Add the mid_price line
+    merged_df = frames[0][1]
+    x, y = downsample(merged_df["timestamp"], merged_df["mid_price"], x_range)
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=y,
+            mode="lines",
+            name="Mid Price",
+            line=dict(color="blue"),
         )
+    )
 
-        # Prepare annotations for buys
-        buy_annotations = [
-            {
-                "x": row["timestamp"],
-                "y": row["mid_price"],
-                "showarrow": True,
-                "arrowhead": 1,
-                "arrowsize": 2,
-                "arrowwidth": 2,
-                "arrowcolor": "green",
-                "yshift": 10,
-            }
-            for index, row in merged_df[merged_df["buyer"] == "SUBMISSION"].iterrows()
+    # One marker trace for our buys and one for our sells per run
+    for run_name, merged_df in frames:
+        visible_df = merged_df.iloc[
+            visible_slice(merged_df["timestamp"].to_numpy(), x_range)
         ]
+        for side, label, color, symbol_name in (
+            (1, "Buys", "green", "triangle-up"),
+            (-1, "Sells", "red", "triangle-down"),
+        ):
+            fills_df = visible_df[visible_df["side"].to_numpy() == side]
+            fig.add_trace(
+                go.Scatter(
+                    x=fills_df["timestamp"],
+                    y=fills_df["mid_price"],
+                    mode="markers",
+                    name=label if len(frames) == 1 else f"{label} - {run_name}",
+                    marker=dict(color=color, size=9, symbol=symbol_name),
+                    customdata=fills_df[["quantity", "price"]],
+                    hovertemplate="%{customdata[0]} @ %{customdata[1]}",
+                )
+            )
 
-        # Prepare annotations for sells
-        sell_annotations = [
-            {
-                "x": row["timestamp"],
-                "y": row["mid_price"],
-                "showarrow": True,
-                "arrowhead": 1,
-                "arrowsize": 2,
-                "arrowwidth": 2,
-                "arrowcolor": "red",
-                "yshift": -10,
-            }
-            for index, row in merged_df[merged_df["seller"] == "SUBMISSION"].iterrows()
-        ]
+    fig.update_layout(
+        title=f"Trade Entries and Exits on Mid Price Timeseries for {symbol}",
+        xaxis_title="Timestamp",
+        yaxis_title="Price",
+        legend_title="Legend",
+    )
 
-        fig.update_layout(annotations=buy_annotations + sell_annotations)
+    return fig
 
-        fig.update_layout(
-            title=f"Trade Entries and Exits on Mid Price Timeseries for {symbol}",
-            xaxis_title="Timestamp",
-            yaxis_title="Price",
-            legend_title="Legend",
-        )
 
-        # Store the figure in the dictionary with a key as the ticker name
-        figures[f"fig_{symbol.lower()}_trades_made"] = fig
+def plot_holdings(frames, symbol, line_color, x_range=None):
+    fig = go.Figure()
 
-    return figures
+    # Add a line for cumulative holdings per run
+    for i, (run_name, merged_df) in enumerate(frames):
+        x, y = downsample(
+            merged_df["timestamp"], merged_df["cumulative_holdings"], x_range
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=y,
+                mode="lines",
+                name=run_name,
+                line=dict(color=trace_color(frames, i, "green")),
+            )
+        )
 
+    # Update layout
+    fig.update_layout(
+        title=f"Cumulative Holdings Over Time for {symbol}",
+        xaxis_title="Timestamp",
+        yaxis_title="Cumulative Holdings",
+        legend_title="Legend",
+    )
 
-# Prepare figures
-trades_made_figures = prepare_ticker_plots(trade_history_df, activities_df)
+    return fig
 
 
-def prepare_holdings_plots(trade_history_df, activities_df):
-    unique_tickers = trade_history_df["symbol"].unique()
-    figures = {}
+class Run:
+    """One parsed log: per-product activities and per-symbol merged fills."""
 
-    for symbol in unique_tickers:
-        # Filter data for the specific ticker
-        ticker_trade_history_df = trade_history_df[trade_history_df["symbol"] == symbol]
-        ticker_activities_df = activities_df[activities_df["product"] == symbol]
+    def __init__(self, path):
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        activities_df, trade_history_df = load_log(path)
+        self.product_dfs = {
+            product: df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+            for product, df in activities_df.groupby("product")
+        }
+        self.ticker_dfs = prepare_ticker_data(trade_history_df, activities_df)
 
-        # Merge the trade history with the activities data on timestamps
-        merged_df = pd.merge(
-            ticker_activities_df, ticker_trade_history_df, on="timestamp", how="outer"
-        )
 
-        # Convert buy/sell actions into signed quantities
-        merged_df["signed_quantity"] = merged_df.apply(
-            lambda row: (
-                row["quantity"]
-                if row["buyer"] == "SUBMISSION"
-                else -row["quantity"] if row["seller"] == "SUBMISSION" else 0
-            ),
-            axis=1,
-        )
+runs = {}
 
-        # Calculate cumulative holdings over time
-        merged_df["cumulative_holdings"] = merged_df["signed_quantity"].cumsum()
 
-        # Create the plot
-        fig = go.Figure()
+def get_run(path):
+    if path not in runs:
+        runs[path] = Run(path)
+    return runs[path]
 
-        # Add a line for cumulative holdings
-        fig.add_trace(
-            go.Scatter(
-                x=merged_df["timestamp"],
-                y=merged_df["cumulative_holdings"],
-                mode="lines",
-                name="Cumulative Holdings",
-                line=dict(color="green"),
-            )
-        )
 
-        # Update layout
-        fig.update_layout(
-            title=f"Cumulative Holdings Over Time for {symbol}",
-            xaxis_title="Timestamp",
-            yaxis_title="Cumulative Holdings",
-            legend_title="Legend",
-        )
+# graph type -> (plotting function, the Run frames it plots, overlays runs)
+GRAPHS = {
+    "price-trends": (plot_product_prices, "product_dfs", False),
+    "bid-prices-volumes": (plot_bid_prices_volumes_dual_axis, "product_dfs", False),
+    "pnl": (plot_pnl, "product_dfs", True),
+    "trades-made": (plot_trades_made, "ticker_dfs", True),
+    "holdings": (plot_holdings, "ticker_dfs", True),
+}
 
-        # Store the figure in the dictionary with a key as the ticker name
-        figures[f"fig_{symbol.lower()}_holdings"] = fig
 
-    return figures
+def graphs(graph_type, selected):
+    table = GRAPHS[graph_type][1]
+    products = sorted({product for run in selected for product in getattr(run, table)})
+    return [
+        dcc.Graph(id={"type": graph_type, "product": product}) for product in products
+    ]
 
 
-# Prepare figures
-holdings_figures = prepare_holdings_plots(trade_history_df, activities_df)
+def layout(paths):
+    return html.Div(
+        children=[
+            html.H1(
+                children="Trading Analysis Dashboard", style={"textAlign": "center"}
+            ),
+            dcc.Dropdown(
+                id="runs",
+                options=[
+                    {"label": os.path.basename(path), "value": path} for path in paths
+                ],
+                value=paths[:1],
+                multi=True,
+            ),
+            html.Div(id="graphs"),
+        ]
+    )
 
 
 app = Dash(__name__)
 
-# App layout
-app.layout = html.Div(
-    children=[
-        html.H1(children="Trading Analysis Dashboard", style={"textAlign": "center"}),
+
+@app.callback(Output("graphs", "children"), Input("runs", "value"))
+def render_sections(paths):
+    selected = [get_run(path) for path in paths or []]
+    return [
         html.Div(
             [
                 html.H2("True Mid-Price and Bid-Ask Price/Volume Trends"),
-                dcc.Graph(
-                    id="price-trends-amethysts", figure=fig_price_trends_amethysts
-                ),
-                dcc.Graph(
-                    id="price-trends-starfruit", figure=fig_price_trends_starfruit
-                ),
-                dcc.Graph(id="price-trends-orchids", figure=fig_price_trends_orchids),
-                dcc.Graph(
-                    id="bid-prices-volumes-amethysts",
-                    figure=fig_bid_prices_volumes_amethysts,
-                ),
-                dcc.Graph(
-                    id="bid-prices-volumes-starfruit",
-                    figure=fig_bid_prices_volumes_starfruit,
-                ),
-                dcc.Graph(
-                    id="bid-prices-volumes-orchids",
-                    figure=fig_bid_prices_volumes_orchids,
-                ),
+                *graphs("price-trends", selected),
+                *graphs("bid-prices-volumes", selected),
             ],
             style={"padding": 10},
         ),
         html.Div(
             [
                 html.H2("Strategy Analysis"),
-                dcc.Graph(id="amethysts-pnl", figure=fig_amethysts_pnl),
-                dcc.Graph(id="starfruit-pnl", figure=fig_starfruit_pnl),
-                dcc.Graph(id="orchids-pnl", figure=fig_orchids_pnl),
-                dcc.Graph(
-                    id="amethysts-trades-made",
-                    figure=trades_made_figures["fig_amethysts_trades_made"],
-                ),
-                dcc.Graph(
-                    id="starfruit-trades-made",
-                    figure=trades_made_figures["fig_starfruit_trades_made"],
-                ),
-                dcc.Graph(
-                    id="orchids-trades-made",
-                    figure=trades_made_figures["fig_orchids_trades_made"],
-                ),
-                dcc.Graph(
-                    id="amethysts-holdings",
-                    figure=holdings_figures["fig_amethysts_holdings"],
-                ),
-                dcc.Graph(
-                    id="starfruit-holdings",
-                    figure=holdings_figures["fig_starfruit_holdings"],
-                ),
-                dcc.Graph(
-                    id="orchids-holdings",
-                    figure=holdings_figures["fig_orchids_holdings"],
-                ),
+                *graphs("pnl", selected),
+                *graphs("trades-made", selected),
+                *graphs("holdings", selected),
             ],
             style={"padding": 10},
         ),
     ]
+
+
+@app.callback(
+    Output({"type": MATCH, "product": MATCH}, "figure"),
+    Input({"type": MATCH, "product": MATCH}, "relayoutData"),
+    State("runs", "value"),
 )
+def render_graph(relayout, paths):
+    # Redraw for the initial render and x-axis zooms, pans and resets only.
+    if ctx.triggered_id is not None and not changes_x(relayout):
+        raise PreventUpdate
+
+    graph = ctx.outputs_list["id"]
+    plot, table, overlay = GRAPHS[graph["type"]]
+    product = graph["product"]
+    frames = [
+        (run.name, getattr(run, table)[product])
+        for run in map(get_run, paths or [])
+        if product in getattr(run, table)
+    ]
+    if not frames:
+        raise PreventUpdate
+
+    x_range = relayout_range(relayout)
+    line_color = colors.get(product, "black")
+    if overlay:
+        fig = plot(frames, product, line_color, x_range)
+    else:
+        # the market data is the same in every run of a day, plot the first
+        fig = plot(frames[0][1], product, line_color, x_range)
+    # keep the user's zoom across the redraw
+    fig.update_layout(uirevision=product)
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    return fig
+
 
 if __name__ == "__main__":
-    app.run_server(debug=True, port="8081")
+    parser = argparse.ArgumentParser(description="Trading analysis dashboard")
+    parser.add_argument(
+        "logs",
+        nargs="?",
+        default=DEFAULT_LOGS,
+        help="a log file or a directory of logs (default: submissions/)",
+    )
+    parser.add_argument("--port", default="8081")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.logs):
+        paths = log_paths(args.logs)
+    else:
+        paths = [args.logs]
+    app.layout = layout(paths)
+    app.run_server(debug=True, port=args.port)
@@ -0,0 +1,109 @@
+"""
+Downsampling for the visualizer: only the x-range the browser is showing is
+sent, reduced to at most MAX_POINTS per trace unless it is already smaller.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_POINTS = 2000
+
+
+def visible_slice(x: np.ndarray, x_range: Optional[Sequence[float]]) -> slice:
+    """The rows of a sorted x inside x_range, plus one on each side."""
+    if x_range is None:
+        return slice(None)
+    start = np.searchsorted(x, x_range[0], side="left")
+    stop = np.searchsorted(x, x_range[1], side="right")
+    return slice(max(start - 1, 0), stop + 1)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets: keep the first and last point and, from
+    each of threshold - 2 buckets in between, the point forming the largest
+    triangle with the previously kept point and the next bucket's mean.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[stop:next_stop].mean()
+        mean_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max(y: np.ndarray, threshold: int) -> np.ndarray:
+    """The lowest and highest point of each of threshold / 2 equal buckets."""
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    width = -(-n // buckets)
+    padded = np.pad(y, (0, buckets * width - n), mode="edge").reshape(buckets, width)
+    offsets = np.arange(buckets) * width
+    indices = np.concatenate(
+        [offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)]
+    )
+    return np.unique(np.minimum(indices, n - 1))
+
+
+def downsample(
+    x,
+    y,
+    x_range: Optional[Sequence[float]] = None,
+    max_points: int = MAX_POINTS,
+    method: str = "lttb",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The visible, non-NaN part of a series sorted by x, reduced to max_points
+    with "lttb" (lines) or "minmax" (markers, keeps every extreme).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    window = visible_slice(x, x_range)
+    x, y = x[window], y[window]
+    finite = np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    if len(x) <= max_points:
+        return x, y
+
+    if method == "minmax":
+        indices = min_max(y, max_points)
+    else:
+        indices = lttb(x, y, max_points)
+    return x[indices], y[indices]
+
+
+def relayout_range(relayout: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """The zoomed x-range from a Graph's relayoutData, None when autoranged."""
+    if not relayout:
+        return None
+    if "xaxis.range[0]" in relayout:
+        return float(relayout["xaxis.range[0]"]), float(relayout["xaxis.range[1]"])
+    if "xaxis.range" in relayout:
+        start, stop = relayout["xaxis.range"]
+        return float(start), float(stop)
+    return None
+
+
+def changes_x(relayout: Optional[dict]) -> bool:
+    """Whether a relayout event zoomed, panned or reset the x axis."""
+    return bool(relayout) and any(key.startswith("xaxis") for key in relayout)
@@ -0,0 +1,79 @@
+"""
+Parsed-log cache for the visualizer: each log's activities and trade history
+are stored once as columnar .npz keyed by a hash of the log's contents, so a
+renamed or copied log is still a hit and an edited one is re-parsed.
+"""
+
+import hashlib
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src")
+)
+from logreader import read_log
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".logcache")
+TABLES = ("activities", "trades")
+
+
+def content_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, f"{digest}.npz")
+
+
+def log_paths(directory: str) -> List[str]:
+    """The .log files in a directory, newest first."""
+    paths = [
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".log")
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def save(path: str, tables: Dict[str, Dict[str, np.ndarray]]) -> None:
+    arrays = {}
+    for table, columns in tables.items():
+        for name, values in columns.items():
+            # strings as fixed-width unicode so the archive loads without pickle
+            if values.dtype == object:
+                values = values.astype(str)
+            arrays[f"{table}_{name}"] = values
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    np.savez(path, **arrays)
+
+
+def load(path: str) -> Dict[str, Dict[str, np.ndarray]]:
+    tables = {table: {} for table in TABLES}
+    with np.load(path) as archive:
+        for key in archive.files:
+            table, name = key.split("_", 1)
+            values = archive[key]
+            if values.dtype.kind == "U":
+                values = values.astype(object)
+            tables[table][name] = values
+    return tables
+
+
+def load_log(path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """The (activities, trade history) frames of a log, parsed at most once."""
+    cached = cache_path(content_hash(path))
+    if os.path.exists(cached):
+        tables = load(cached)
+    else:
+        parsed = read_log(path)
+        tables = {"activities": parsed.activities, "trades": parsed.trades}
+        save(cached, tables)
+    return pd.DataFrame(tables["activities"]), pd.DataFrame(tables["trades"])
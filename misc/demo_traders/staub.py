@@ -2,9 +2,6 @@ import json
 import math
 from typing import Any, OrderedDict
 
-import jsonpickle
-import numpy as np
-
 from datamodel import (
     Listing,
     Observation,
@@ -32,33 +29,33 @@ class Logger:
         conversions: int,
         trader_data: str,
     ) -> None:
-        base_length = len(
-            self.to_json(
-                [
-                    self.compress_state(state, ""),
-                    self.compress_orders(orders),
-                    conversions,
-                    "",
-                    "",
-                ]
-            )
+        # Encode everything once with empty strings in the three variable slots,
+        # then splice the truncated strings into those slots.
+        base = self.to_json(
+            [
+                self.compress_state(state, ""),
+                self.compress_orders(orders),
+                conversions,
+                "",
+                "",
+            ]
         )
 
         # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
-        max_item_length = (self.max_log_length - base_length) // 3
+        max_item_length = (self.max_log_length - len(base)) // 3
 
+        # base is '[[<timestamp>,""' + rest of the state ... + ',"",""]'
+        head = len(str(state.timestamp)) + 3
+        tail = len(',"",""]')
         print(
-            self.to_json(
-                [
-                    self.compress_state(
-                        state, self.truncate(state.traderData, max_item_length)
-                    ),
-                    self.compress_orders(orders),
-                    conversions,
-                    self.truncate(trader_data, max_item_length),
-                    self.truncate(self.logs, max_item_length),
-                ]
-            )
+            base[:head]
+            + self.to_json(self.truncate(state.traderData, max_item_length))
+            + base[head + 2 : -tail]
+            + ","
+            + self.to_json(self.truncate(trader_data, max_item_length))
+            + ","
+            + self.to_json(self.truncate(self.logs, max_item_length))
+            + "]"
         )
 
         self.logs = ""
@@ -149,6 +146,34 @@ logger = Logger()
 # OUR CODE -------------------------------- -------------------------------- -------------------------------- -------------------------------- --------------------------------
 
 
+class TraderDataCodec:
+    """
+    Schema-driven traderData encoding: "<version>:<json array of the fields in
+    schema order>". Field names never hit the wire and decoding is a single
+    json.loads, so the string stays short and cheap. decode returns None for
+    anything written under another version or not by this codec at all.
+    """
+
+    def __init__(self, version: str, fields: list[str]) -> None:
+        self.prefix = version + ":"
+        self.fields = fields
+
+    def encode(self, data: dict[str, Any]) -> str:
+        values = [data[name] for name in self.fields]
+        return self.prefix + json.dumps(values, separators=(",", ":"))
+
+    def decode(self, encoded: str) -> dict[str, Any] | None:
+        if not encoded.startswith(self.prefix):
+            return None
+        try:
+            values = json.loads(encoded[len(self.prefix) :])
+        except ValueError:
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            return None
+        return dict(zip(self.fields, values))
+
+
 class HistoricalVWAP:
     def __init__(self, bv=0, sv=0, bpv=0, spv=0):
         self.buy_volume = bv
@@ -157,10 +182,55 @@ class HistoricalVWAP:
         self.sell_price_volume = spv
 
 
+class SlidingTrend:
+    """
+    Least-squares line through the last `size` values placed at x = 0..size-1,
+    kept as running sums of y and x*y over a ring buffer so that pushing a
+    value (evicting the oldest) and estimating are both O(1).
+    """
+
+    def __init__(self, size, values=None, head=0, sum_y=0.0, sum_xy=0.0):
+        self.size = size
+        self.values = values if values is not None else []
+        self.head = head
+        self.sum_y = sum_y
+        self.sum_xy = sum_xy
+
+    def push(self, y):
+        n = len(self.values)
+        if n < self.size:
+            self.values.append(y)
+            self.sum_xy += n * y
+            self.sum_y += y
+            return
+
+        # every remaining value moves one step left, the new one lands at n - 1
+        oldest = self.values[self.head]
+        self.sum_xy += (n - 1) * y - (self.sum_y - oldest)
+        self.sum_y += y - oldest
+        self.values[self.head] = y
+        self.head = (self.head + 1) % n
+
+    def full(self):
+        return len(self.values) == self.size
+
+    def estimate(self):
+        # value of the fitted line one step past the window, at x = n
+        n = len(self.values)
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        slope = (n * self.sum_xy - sum_x * self.sum_y) / (n * sum_xx - sum_x * sum_x)
+        intercept = (self.sum_y - slope * sum_x) / n
+        return slope * n + intercept
+
+    def to_state(self):
+        return [self.values, self.head, self.sum_y, self.sum_xy]
+
+
 class RecordedData:
     def __init__(self):
         self.amethyst_hvwap = HistoricalVWAP()
-        self.starfruit_cache = []
+        self.starfruit_trend = SlidingTrend(38)
         self.LIMIT = {"AMETHYSTS": 20, "STARFRUIT": 20, "ORCHIDS": 100}
         self.INF = int(1e9)
         self.STARFRUIT_CACHE_SIZE = 38
@@ -168,6 +238,54 @@ class RecordedData:
         self.POSITION = {"AMETHYSTS": 0, "STARFRUIT": 0, "ORCHIDS": 0}
         self.ORCHID_MM_RANGE = 5
 
+    def encode(self) -> str:
+        hvwap = self.amethyst_hvwap
+        return RECORDED_DATA_CODEC.encode(
+            {
+                "amethyst_hvwap": [
+                    hvwap.buy_volume,
+                    hvwap.sell_volume,
+                    hvwap.buy_price_volume,
+                    hvwap.sell_price_volume,
+                ],
+                "starfruit_trend": self.starfruit_trend.to_state(),
+                "POSITION": self.POSITION,
+                "STARFRUIT_CACHE_SIZE": self.STARFRUIT_CACHE_SIZE,
+                "AME_RANGE": self.AME_RANGE,
+                "ORCHID_MM_RANGE": self.ORCHID_MM_RANGE,
+            }
+        )
+
+    @staticmethod
+    def decode(encoded: str) -> "RecordedData | None":
+        fields = RECORDED_DATA_CODEC.decode(encoded)
+        if fields is None:
+            return None
+        data = RecordedData()
+        data.amethyst_hvwap = HistoricalVWAP(*fields["amethyst_hvwap"])
+        data.POSITION = fields["POSITION"]
+        data.STARFRUIT_CACHE_SIZE = fields["STARFRUIT_CACHE_SIZE"]
+        data.starfruit_trend = SlidingTrend(
+            data.STARFRUIT_CACHE_SIZE, *fields["starfruit_trend"]
+        )
+        data.AME_RANGE = fields["AME_RANGE"]
+        data.ORCHID_MM_RANGE = fields["ORCHID_MM_RANGE"]
+        return data
+
+
+# LIMIT and INF are constants, only the fields that change are encoded
+RECORDED_DATA_CODEC = TraderDataCodec(
+    "2",
+    [
+        "amethyst_hvwap",
+        "starfruit_trend",
+        "POSITION",
+        "STARFRUIT_CACHE_SIZE",
+        "AME_RANGE",
+        "ORCHID_MM_RANGE",
+    ],
+)
+
 
 class Trader:
     LIMIT = {"AMETHYSTS": 20, "STARFRUIT": 20, "ORCHIDS": 100}
@@ -177,12 +295,8 @@ class Trader:
     ORCHID_MM_RANGE = 5
     POSITION = {}
 
-    def estimate_starfruit_price(self, cache):
-        x = np.array([i for i in range(self.STARFRUIT_CACHE_SIZE)])
-        y = np.array(cache)
-        A = np.vstack([x, np.ones(len(x))]).T
-        m, c = np.linalg.lstsq(A, y, rcond=None)[0]
-        return int(round(self.STARFRUIT_CACHE_SIZE * m + c))
+    def estimate_starfruit_price(self, trend):
+        return int(round(trend.estimate()))
 
         # coef = [-0.01869561,  0.0455032 ,  0.16316049,  0.8090892] #
         # intercept = 4.481696494462085
@@ -289,10 +403,14 @@ class Trader:
         result = {}
         conversions = 0
 
-        if state.traderData == "":  # first run, set up data
+        data = RecordedData.decode(state.traderData)
+        if data is None:  # first run (or an older format), set up data
             data = RecordedData()
-        else:
-            data = jsonpickle.decode(state.traderData)
+            # carry over tunables set on the instance, e.g. by sweep.py
+            data.STARFRUIT_CACHE_SIZE = self.STARFRUIT_CACHE_SIZE
+            data.starfruit_trend = SlidingTrend(self.STARFRUIT_CACHE_SIZE)
+            data.AME_RANGE = self.AME_RANGE
+            data.ORCHID_MM_RANGE = self.ORCHID_MM_RANGE
 
         self.LIMIT = data.LIMIT
         self.INF = data.INF
@@ -317,10 +435,6 @@ class Trader:
                 )
 
             elif product == "STARFRUIT":
-                # keep the length of starfruit cache as STARFRUIT_CACHE_SIZE
-                if len(data.starfruit_cache) == self.STARFRUIT_CACHE_SIZE:
-                    data.starfruit_cache.pop(0)
-
                 _, best_sell_price = self.get_volume_and_best_price(
                     order_depth.sell_orders, buy_order=False
                 )
@@ -328,18 +442,19 @@ class Trader:
                     order_depth.buy_orders, buy_order=True
                 )
 
-                data.starfruit_cache.append((best_sell_price + best_buy_price) / 2)
+                # the trend keeps the last STARFRUIT_CACHE_SIZE mids
+                data.starfruit_trend.push((best_sell_price + best_buy_price) / 2)
 
                 # if cache size is maxed, calculate next price and place orders
                 lower_bound = -self.INF
                 upper_bound = self.INF
 
-                if len(data.starfruit_cache) == self.STARFRUIT_CACHE_SIZE:
+                if data.starfruit_trend.full():
                     lower_bound = (
-                        self.estimate_starfruit_price(data.starfruit_cache) - 2
+                        self.estimate_starfruit_price(data.starfruit_trend) - 2
                     )
                     upper_bound = (
-                        self.estimate_starfruit_price(data.starfruit_cache) + 2
+                        self.estimate_starfruit_price(data.starfruit_trend) + 2
                     )
 
                 orders += self.calculate_orders(
@@ -382,7 +497,7 @@ class Trader:
             # update orders for current product
             result[product] = orders
 
-        traderData = jsonpickle.encode(data)
+        traderData = data.encode()
 
         logger.flush(state, result, conversions, traderData)
         return result, conversions, traderData
@@ -2,41 +2,74 @@ import string
 from typing import List
 
 import numpy as np
-import pandas as pd
 
 from datamodel import Order, OrderDepth, TradingState, UserId
 
 
+class TradeTape:
+    """
+    Fixed-capacity trade history for one product, backed by a NumPy array
+    twice the capacity. Rows are appended at the end; when the array fills,
+    the newest `capacity` rows are moved back to the front, evicting the rest.
+    That keeps appends amortized O(1) and the latest rows a contiguous view.
+    With evict=False the array doubles instead and nothing is dropped.
+    """
+
+    DTYPE = np.dtype([("timestamp", "i8"), ("price", "f8"), ("quantity", "i8")])
+
+    def __init__(self, capacity: int = 1000, evict: bool = True):
+        self.capacity = capacity
+        self.evict = evict
+        self.rows = np.empty(2 * capacity, dtype=self.DTYPE)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"TradeTape({len(self)} trades, last {self.tail(3).tolist()})"
+
+    def append(self, timestamp: int, price: float, quantity: int):
+        if self.end == len(self.rows):
+            if self.evict:
+                keep = min(len(self), self.capacity - 1)
+                self.rows[:keep] = self.rows[self.end - keep : self.end]
+                self.start, self.end = 0, keep
+            else:
+                self.rows = np.resize(self.rows, 2 * len(self.rows))
+        self.rows[self.end] = (timestamp, price, quantity)
+        self.end += 1
+        if self.evict and len(self) > self.capacity:
+            self.start += 1
+
+    def tail(self, n: int) -> np.ndarray:
+        return self.rows[max(self.start, self.end - n) : self.end]
+
+    def trend(self, n: int) -> float:
+        """Least-squares slope of the last n trade prices, 0 if there are fewer."""
+        if len(self) < n:
+            return 0
+        prices = self.tail(n)["price"]
+        x = np.arange(n) - (n - 1) / 2
+        return float(x @ (prices - prices.mean()) / (x @ x))
+
+
 class Trader:
 
     def __init__(self):
         self.price_history: dict[str, List[float]] = {}
         self.position_limits = {"STARFRUIT": 20, "AMETHYSTS": 20}
-        self.product_dfs = {}  # Dictionary to store dataframes for each product
+        self.trade_tapes: dict[str, TradeTape] = {}  # market trades per product
 
     def update_trade_history(self, market_trades: dict[str, List]):
         for product, trades in market_trades.items():
-            if product not in self.product_dfs:
-                self.product_dfs[product] = pd.DataFrame(
-                    columns=["timestamp", "price", "quantity"]
-                )
-
-            # Convert trade objects to a list of dictionaries
-            trades_data = [
-                {
-                    "timestamp": trade.timestamp,
-                    "price": trade.price,
-                    "quantity": trade.quantity,
-                }
-                for trade in trades
-            ]
-
-            # Append new trades to the dataframe
-            if trades_data:
-                self.product_dfs[product] = pd.concat(
-                    [self.product_dfs[product], pd.DataFrame(trades_data)],
-                    ignore_index=True,
-                )
+            if product not in self.trade_tapes:
+                self.trade_tapes[product] = TradeTape()
+
+            tape = self.trade_tapes[product]
+            for trade in trades:
+                tape.append(trade.timestamp, trade.price, trade.quantity)
 
     def calculate_acceptable_price(
         self, buy_orders: dict, sell_orders: dict, product
@@ -65,31 +98,18 @@ class Trader:
             return 0  # Fallback if no orders
 
     def calculate_price_trend(self, product: str, lookback_periods: int = 10) -> float:
-        df = self.product_dfs.get(product, pd.DataFrame())
-        if df.empty or len(df) < lookback_periods:
+        tape = self.trade_tapes.get(product)
+        if tape is None:
             return 0  # Not enough data to establish a trend
 
-        # Take the last 'lookback_periods' data points
-        recent_data = df.tail(lookback_periods).copy()
-
-        # Convert 'price' column to numeric type, using 'coerce' to handle any conversion errors
-        recent_data["price"] = pd.to_numeric(recent_data["price"], errors="coerce")
-        X = np.arange(len(recent_data))  # Independent variable (time)
-        y = recent_data["price"].values  # Dependent variable (price)
-
-        try:
-            slope, _ = np.polyfit(X, y, 1)
-        except TypeError as e:
-            print(f"Error in polyfit: {e}")
-            return 0
-
-        return slope
+        # slope of the last 'lookback_periods' trade prices
+        return tape.trend(lookback_periods)
 
     def run(self, state: TradingState):
         self.update_trade_history(state.market_trades)
-        # print(self.product_dfs)
+        # print(self.trade_tapes)
 
-        # print(f"t={state.timestamp}, trade_ledger={self.product_dfs}")
+        # print(f"t={state.timestamp}, trade_ledger={self.trade_tapes}")
         # print(f"t={state.timestamp}, observations={state.market_trades}")
 
         result = {}
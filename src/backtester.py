@@ -0,0 +1,461 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import compact_datamodel
+import datamodel
+from conversions import ConversionSettler
+from datamodel import OrderDepth, Symbol, Trade, TradingState
+from matching import SUBMISSION, match_orders
+from profiler import Profiler
+from tickstore import available_days, load_day
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class DayData:
+    """
+    One round/day of the tick store, unpacked once into per-timestamp lookups
+    so that building a TradingState per tick is only a handful of dict copies.
+    """
+
+    def __init__(self, round_num: int, day: int) -> None:
+        self.round_num = round_num
+        self.day = day
+        self.tick_day = load_day(round_num, day)
+        self.products: List[Symbol] = sorted(self.tick_day.price_index)
+        # timestamp -> product -> pristine book, its dicts copied into each
+        # TradingState. Plain dicts, as the exchange delivers them and as the
+        # strategies read them.
+        self.books: Dict[int, Dict[Symbol, OrderDepth]] = defaultdict(dict)
+        # timestamp -> product -> mid price
+        self.mid_prices: Dict[int, Dict[Symbol, float]] = defaultdict(dict)
+        # timestamp -> product -> row in tick_day.prices, reused when writing a log
+        self.rows: Dict[int, Dict[Symbol, int]] = defaultdict(dict)
+        # timestamp -> list of (symbol, price, quantity, buyer, seller)
+        self.trades: Dict[int, List[tuple]] = defaultdict(list)
+        # timestamp -> product -> ConversionObservation fields
+        self.observations: Dict[int, Dict[Symbol, tuple]] = {}
+
+        for product in self.products:
+            self.load_books(product)
+        self.load_trades()
+        self.load_observations()
+
+        self.timestamps: List[int] = sorted(set(self.books) | set(self.observations))
+        self.conversion_products: List[Symbol] = sorted(
+            {product for products in self.observations.values() for product in products}
+        )
+
+    def load_books(self, product: Symbol) -> None:
+        start, _ = self.tick_day.price_index[product]
+        rows = self.tick_day.product_prices(product)
+        bid_prices = rows["bid_price"].tolist()
+        bid_volumes = rows["bid_volume"].tolist()
+        ask_prices = rows["ask_price"].tolist()
+        ask_volumes = rows["ask_volume"].tolist()
+        mid_prices = rows["mid_price"].tolist()
+
+        for i, timestamp in enumerate(rows["timestamp"].tolist()):
+            # levels come best first, missing ones have a NaN price
+            book = OrderDepth()
+            book.buy_orders = {
+                int(price): volume
+                for price, volume in zip(bid_prices[i], bid_volumes[i])
+                if price == price
+            }
+            book.sell_orders = {
+                int(price): -abs(volume)
+                for price, volume in zip(ask_prices[i], ask_volumes[i])
+                if price == price
+            }
+            self.books[timestamp][product] = book
+            self.mid_prices[timestamp][product] = (
+                mid_prices[i] if mid_prices[i] == mid_prices[i] else 0.0
+            )
+            self.rows[timestamp][product] = start + i
+
+    def load_trades(self) -> None:
+        trades = self.tick_day.trades
+        products = self.tick_day.products
+        for timestamp, product, price, quantity in zip(
+            trades["timestamp"].tolist(),
+            trades["product"].tolist(),
+            trades["price"].tolist(),
+            trades["quantity"].tolist(),
+        ):
+            self.trades[timestamp].append(
+                (products[product], int(price), quantity, "", "")
+            )
+
+    def load_observations(self) -> None:
+        # Round 2 only ships the ORCHIDS observation stream, the south island
+        # quotes a single price so it is used for both sides.
+        observations = self.tick_day.observations
+        for row in observations.tolist():
+            (
+                timestamp,
+                price,
+                transport_fees,
+                export_tariff,
+                import_tariff,
+                sunlight,
+                humidity,
+            ) = row
+            self.observations[timestamp] = {
+                "ORCHIDS": (
+                    price,
+                    price,
+                    transport_fees,
+                    export_tariff,
+                    import_tariff,
+                    sunlight,
+                    humidity,
+                )
+            }
+
+
+class BacktestResult:
+    def __init__(self, round_num: int, day: int, products: List[Symbol]) -> None:
+        self.round_num = round_num
+        self.day = day
+        self.products = products
+        self.timestamps: List[int] = []
+        self.pnl: Dict[Symbol, List[float]] = {product: [] for product in products}
+        self.positions: Dict[Symbol, List[int]] = {product: [] for product in products}
+        self.own_trades: List[Trade] = []
+        self.lambda_logs: List[str] = []
+        self.conversions: List[int] = []
+        # units actually converted per tick, positive when bought from the south
+        self.converted: List[int] = []
+        self.conversion_fees: Dict[Symbol, float] = {}
+        self.storage_costs: Dict[Symbol, float] = {}
+        self.runtime = 0.0
+        self.trader_time = 0.0
+
+    def final_pnl(self) -> Dict[Symbol, float]:
+        return {
+            product: values[-1] if values else 0.0
+            for product, values in self.pnl.items()
+        }
+
+    def total_pnl(self) -> float:
+        return sum(self.final_pnl().values())
+
+    def overhead(self) -> float:
+        return self.runtime - self.trader_time
+
+
+def load_trader(path: str):
+    """Import a trader file and return a fresh instance of its Trader class."""
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so jsonpickle can resolve classes defined in the trader file.
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module.Trader()
+
+
+def build_state(
+    data: DayData,
+    timestamp: int,
+    trader_data: str,
+    own_trades: Dict[Symbol, List[Trade]],
+    market_trades: Dict[Symbol, List[Trade]],
+    position: Dict[Symbol, int],
+    model=datamodel,
+) -> TradingState:
+    # The exchange delivers listings as plain dicts, which is what
+    # Logger.compress_listings indexes into.
+    listings = {}
+    order_depths = {}
+    for product, book in data.books.get(timestamp, {}).items():
+        listings[product] = {
+            "symbol": product,
+            "product": product,
+            "denomination": "SEASHELLS",
+        }
+        order_depth = model.OrderDepth()
+        order_depth.buy_orders = book.buy_orders.copy()
+        order_depth.sell_orders = book.sell_orders.copy()
+        order_depths[product] = order_depth
+
+    conversion_observations = {
+        product: model.ConversionObservation(*values)
+        for product, values in data.observations.get(timestamp, {}).items()
+    }
+
+    return TradingState(
+        trader_data,
+        timestamp,
+        listings,
+        order_depths,
+        own_trades,
+        market_trades,
+        dict(position),
+        model.Observation({}, conversion_observations),
+    )
+
+
+def group_trades(trades: Iterable[Trade]) -> Dict[Symbol, List[Trade]]:
+    grouped = defaultdict(list)
+    for trade in trades:
+        grouped[trade.symbol].append(trade)
+    return dict(grouped)
+
+
+def run_backtest(
+    trader,
+    data: DayData,
+    print_output: bool = False,
+    keep_logs: bool = False,
+    compact: bool = False,
+) -> BacktestResult:
+    """
+    Replay a day through the trader. With compact=True the order depths,
+    trades and observations the backtester creates use the slotted
+    compact_datamodel classes, about 13% less memory for a day's worth of
+    them (benchmarks.py memory).
+
+    Conversions are settled against the tick's south quotes before its
+    orders are matched, and net long positions pay storage every tick.
+    """
+    model = compact_datamodel if compact else datamodel
+    products = data.products + [
+        product for product in data.conversion_products if product not in data.products
+    ]
+    result = BacktestResult(data.round_num, data.day, products)
+    settler = ConversionSettler()
+
+    trader_data = ""
+    position: Dict[Symbol, int] = {}
+    cash: Dict[Symbol, float] = {}
+    own_trades: Dict[Symbol, List[Trade]] = {}
+    market_trades: Dict[Symbol, List[Trade]] = {}
+
+    start = time.perf_counter()
+    for timestamp in data.timestamps:
+        state = build_state(
+            data, timestamp, trader_data, own_trades, market_trades, position, model
+        )
+
+        stdout = io.StringIO()
+        trader_start = time.perf_counter()
+        with contextlib.redirect_stdout(stdout):
+            orders, conversions, trader_data = trader.run(state)
+        result.trader_time += time.perf_counter() - trader_start
+
+        output = stdout.getvalue()
+        if print_output:
+            sys.stdout.write(output)
+        if keep_logs:
+            result.lambda_logs.append(output)
+
+        converted = settler.convert(
+            conversions, position, data.observations.get(timestamp, {})
+        )
+
+        tick_trades = group_trades(
+            model.Trade(symbol, price, quantity, buyer, seller, timestamp)
+            for symbol, price, quantity, buyer, seller in data.trades.get(timestamp, [])
+        )
+        # match_orders reduces tick_trades' quantities in place as our orders
+        # take them, only what is left is reported as next tick's market trades
+        fills, position = match_orders(
+            timestamp,
+            data.books.get(timestamp, {}),
+            orders,
+            position,
+            tick_trades,
+            trade_class=model.Trade,
+        )
+        for fill in fills:
+            if fill.buyer == SUBMISSION:
+                cash[fill.symbol] = (
+                    cash.get(fill.symbol, 0) - fill.price * fill.quantity
+                )
+            else:
+                cash[fill.symbol] = (
+                    cash.get(fill.symbol, 0) + fill.price * fill.quantity
+                )
+        settler.charge_storage(position)
+
+        result.timestamps.append(timestamp)
+        result.own_trades.extend(fills)
+        result.conversions.append(conversions)
+        result.converted.append(converted)
+        mid_prices = data.mid_prices.get(timestamp, {})
+        for product in products:
+            held = position.get(product, 0)
+            result.positions[product].append(held)
+            result.pnl[product].append(
+                cash.get(product, 0)
+                + settler.cash.get(product, 0)
+                + held * mid_prices.get(product, 0)
+            )
+
+        # what the bots traded with each other is reported on the next tick
+        own_trades = group_trades(fills)
+        market_trades = {
+            product: [trade for trade in trades if trade.quantity > 0]
+            for product, trades in tick_trades.items()
+        }
+
+    result.runtime = time.perf_counter() - start
+    result.conversion_fees = settler.fees
+    result.storage_costs = settler.storage
+    return result
+
+
+def format_activity(
+    data: DayData, timestamp: int, product: Symbol, row: int, pnl: float
+) -> str:
+    values = data.tick_day.prices[row]
+    fields = [str(data.day), str(timestamp), product]
+    for side in ("bid", "ask"):
+        for price, volume in zip(values[f"{side}_price"], values[f"{side}_volume"]):
+            if price == price:
+                fields.extend([str(int(price)), str(volume)])
+            else:
+                fields.extend(["", ""])
+    fields.extend([str(float(values["mid_price"])), str(pnl)])
+    return ";".join(fields) + "\n"
+
+
+def write_log(result: BacktestResult, data: DayData, path: str) -> None:
+    """Write a log in the same layout as the exchange submission logs."""
+    with open(path, "w") as file:
+        file.write("Sandbox logs:\n")
+        for timestamp, lambda_log in zip(result.timestamps, result.lambda_logs):
+            record = {"sandboxLog": "", "lambdaLog": lambda_log, "timestamp": timestamp}
+            file.write(json.dumps(record, indent=2) + "\n")
+
+        file.write("\n\n\nActivities log:\n")
+        file.write(
+            "day;timestamp;product;"
+            + ";".join(
+                f"{side}_{field}_{level}"
+                for side in ("bid", "ask")
+                for level in range(1, 4)
+                for field in ("price", "volume")
+            )
+            + ";mid_price;profit_and_loss\n"
+        )
+        for i, timestamp in enumerate(result.timestamps):
+            for product, row in data.rows.get(timestamp, {}).items():
+                file.write(
+                    format_activity(
+                        data, timestamp, product, row, result.pnl[product][i]
+                    )
+                )
+
+        file.write("\n\n\nTrade History:\n")
+        history = [
+            {
+                "timestamp": trade.timestamp,
+                "buyer": trade.buyer,
+                "seller": trade.seller,
+                "symbol": trade.symbol,
+                "currency": "SEASHELLS",
+                "price": trade.price,
+                "quantity": trade.quantity,
+            }
+            for trade in result.own_trades
+        ]
+        file.write(json.dumps(history, indent=2) + "\n")
+
+
+def parse_days(arguments: List[str]) -> List[Tuple[int, int]]:
+    # "1" runs every day of round 1, "1-0" or "1--2" a single day
+    days = []
+    for argument in arguments:
+        round_str, _, day_str = argument.partition("-")
+        round_num = int(round_str)
+        if day_str:
+            days.append((round_num, int(day_str)))
+        else:
+            days.extend(
+                (available_round, day)
+                for available_round, day in available_days()
+                if available_round == round_num
+            )
+    return days
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay data bottle days through a Trader"
+    )
+    parser.add_argument(
+        "algorithm", help="path to the file containing the Trader class"
+    )
+    parser.add_argument(
+        "days", nargs="+", help='days to run, e.g. "1", "1-0" or "1--2"'
+    )
+    parser.add_argument(
+        "--print", action="store_true", help="print the trader's output"
+    )
+    parser.add_argument("--out", help="write a submission-style log to this path")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="use the slotted compact_datamodel value classes",
+    )
+    parser.add_argument(
+        "--profile",
+        help="time the phases of Trader.run and write p50/p99/max to this "
+        ".csv or .json path",
+    )
+    args = parser.parse_args()
+    profiler = Profiler() if args.profile else None
+
+    for round_num, day in parse_days(args.days):
+        data = DayData(round_num, day)
+        trader = load_trader(args.algorithm)
+        if profiler:
+            profiler.attach(trader)
+        result = run_backtest(
+            trader, data, args.print, keep_logs=bool(args.out), compact=args.compact
+        )
+
+        print(f"Round {round_num} day {day}")
+        for product, pnl in result.final_pnl().items():
+            print(f"  {product}: {pnl:,.0f}")
+        print(f"  Total profit: {result.total_pnl():,.0f}")
+        if any(result.converted) or result.storage_costs:
+            print(
+                f"  {sum(map(abs, result.converted))} units converted, "
+                f"{sum(result.conversion_fees.values()):,.1f} in fees and tariffs, "
+                f"{sum(result.storage_costs.values()):,.1f} in storage"
+            )
+        print(
+            f"  {len(result.timestamps)} ticks in {result.runtime:.2f}s "
+            f"({result.overhead():.2f}s outside Trader.run)"
+        )
+
+        if args.out:
+            out = args.out
+            if len(args.days) > 1 or "-" not in args.days[0]:
+                root, ext = os.path.splitext(args.out)
+                out = f"{root}_round_{round_num}_day_{day}{ext or '.log'}"
+            write_log(result, data, out)
+
+    if profiler:
+        print("Trader.run phases")
+        profiler.print_summary()
+        profiler.write(args.profile)
+
+
+if __name__ == "__main__":
+    main()
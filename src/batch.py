@@ -0,0 +1,192 @@
+import argparse
+import csv
+import os
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from backtester import BacktestResult, DayData, load_trader, parse_days, run_backtest
+from tickstore import available_days
+
+ALL_PRODUCTS = "TOTAL"
+FIELDS = [
+    "round",
+    "day",
+    "product",
+    "pnl",
+    "max_drawdown",
+    "fills",
+    "volume",
+    "max_position",
+    "runtime",
+]
+
+worker_algorithm = ""
+
+
+def init_worker(algorithm: str) -> None:
+    global worker_algorithm
+    worker_algorithm = algorithm
+
+
+def max_drawdown(pnl: np.ndarray) -> float:
+    if len(pnl) == 0:
+        return 0.0
+    return float(np.max(np.maximum.accumulate(pnl) - pnl))
+
+
+def day_rows(result: BacktestResult) -> List[Dict[str, Any]]:
+    """One row per product plus a TOTAL row for the day."""
+    fills: Dict[str, int] = defaultdict(int)
+    volume: Dict[str, int] = defaultdict(int)
+    for trade in result.own_trades:
+        fills[trade.symbol] += 1
+        volume[trade.symbol] += trade.quantity
+
+    rows = []
+    total_pnl = np.zeros(len(result.timestamps))
+    for product in result.products:
+        pnl = np.asarray(result.pnl[product], dtype=np.float64)
+        positions = np.abs(np.asarray(result.positions[product]))
+        total_pnl += pnl
+        rows.append(
+            {
+                "round": result.round_num,
+                "day": result.day,
+                "product": product,
+                "pnl": round(float(pnl[-1]) if len(pnl) else 0.0, 1),
+                "max_drawdown": round(max_drawdown(pnl), 1),
+                "fills": fills[product],
+                "volume": volume[product],
+                "max_position": int(positions.max()) if len(positions) else 0,
+                "runtime": "",
+            }
+        )
+
+    rows.append(
+        {
+            "round": result.round_num,
+            "day": result.day,
+            "product": ALL_PRODUCTS,
+            "pnl": round(result.total_pnl(), 1),
+            "max_drawdown": round(max_drawdown(total_pnl), 1),
+            "fills": len(result.own_trades),
+            "volume": sum(volume.values()),
+            "max_position": "",
+            "runtime": round(result.runtime, 3),
+        }
+    )
+    return rows
+
+
+def run_day(day: Tuple[int, int]) -> List[Dict[str, Any]]:
+    round_num, day_num = day
+    # a fresh module per day, strategies keep state on the class as well
+    trader = load_trader(worker_algorithm)
+    return day_rows(run_backtest(trader, DayData(round_num, day_num)))
+
+
+def run_batch(
+    algorithm: str, days: List[Tuple[int, int]], workers: int | None = None
+) -> List[Dict[str, Any]]:
+    """Backtest every day in its own worker process, rows in day order."""
+    processes = min(workers or os.cpu_count() or 1, len(days))
+    with Pool(
+        processes=processes, initializer=init_worker, initargs=(algorithm,)
+    ) as pool:
+        results = pool.map(run_day, days, chunksize=1)
+    return [row for rows in results for row in rows]
+
+
+def product_totals(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per product across every day: summed PnL and fills, worst drawdown."""
+    totals: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        total = totals.setdefault(
+            row["product"],
+            {
+                "product": row["product"],
+                "days": 0,
+                "pnl": 0.0,
+                "worst_drawdown": 0.0,
+                "fills": 0,
+                "volume": 0,
+            },
+        )
+        total["days"] += 1
+        total["pnl"] += row["pnl"]
+        total["worst_drawdown"] = max(total["worst_drawdown"], row["max_drawdown"])
+        total["fills"] += row["fills"]
+        total["volume"] += row["volume"]
+    return sorted(totals.values(), key=lambda total: total["product"] == ALL_PRODUCTS)
+
+
+def write_rows(rows: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    header = (
+        f"  {'round':>5}{'day':>5}  {'product':<14}{'pnl':>12}{'max dd':>10}"
+        f"{'fills':>8}{'volume':>8}{'runtime':>9}"
+    )
+    print(header)
+    for row in rows:
+        runtime = f"{row['runtime']:.2f}s" if row["runtime"] != "" else ""
+        print(
+            f"  {row['round']:>5}{row['day']:>5}  {row['product']:<14}"
+            f"{row['pnl']:>12,.0f}{row['max_drawdown']:>10,.0f}"
+            f"{row['fills']:>8}{row['volume']:>8}{runtime:>9}"
+        )
+
+    print("\n  across days")
+    for total in product_totals(rows):
+        print(
+            f"  {total['product']:<14}{total['days']:>4} days"
+            f"{total['pnl']:>12,.0f}{total['worst_drawdown']:>10,.0f}"
+            f"{total['fills']:>8}{total['volume']:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Backtest a Trader on many days at once, one process per day"
+    )
+    parser.add_argument(
+        "algorithm", help="path to the file containing the Trader class"
+    )
+    parser.add_argument(
+        "days",
+        nargs="*",
+        help='days to run, e.g. "1", "1-0" or "1--2" (default: every day)',
+    )
+    parser.add_argument(
+        "--workers", type=int, help="processes to use (default: all cores)"
+    )
+    parser.add_argument("--out", help="write the per-day, per-product rows to a CSV")
+    args = parser.parse_args()
+
+    days = parse_days(args.days) if args.days else available_days()
+    start = time.perf_counter()
+    rows = run_batch(os.path.abspath(args.algorithm), days, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print_report(rows)
+    backtest_time = sum(row["runtime"] for row in rows if row["runtime"] != "")
+    print(
+        f"\n{len(days)} days in {elapsed:.1f}s "
+        f"({backtest_time:.1f}s of backtests across the workers)"
+    )
+    if args.out:
+        write_rows(rows, args.out)
+        print(f"Rows written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,584 @@
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List
+
+import jsonpickle
+import numpy as np
+
+import compact_datamodel
+import datamodel
+import trader
+from backtester import DayData, load_trader, run_backtest
+from datamodel import (
+    ConversionObservation,
+    Observation,
+    Order,
+    OrderDepth,
+    Trade,
+    TradingState,
+)
+from orderbook import OrderBook
+from tickstore import load_day
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STAUB = os.path.join(SRC_DIR, "..", "misc", "demo_traders", "staub.py")
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def report(
+    name: str, baseline: float, candidate: float, labels=("dict", "array")
+) -> None:
+    print(
+        f"  {name:<12} {labels[0]} {baseline * 1000:8.2f}ms   "
+        f"{labels[1]} {candidate * 1000:8.2f}ms   {baseline / candidate:5.2f}x"
+    )
+
+
+def dict_depth(bid_prices, bid_volumes, ask_prices, ask_volumes) -> OrderDepth:
+    order_depth = OrderDepth()
+    order_depth.buy_orders = {
+        int(price): volume
+        for price, volume in zip(bid_prices, bid_volumes)
+        if price == price
+    }
+    order_depth.sell_orders = {
+        int(price): -volume
+        for price, volume in zip(ask_prices, ask_volumes)
+        if price == price
+    }
+    return order_depth
+
+
+def copy_depth(order_depth: OrderDepth) -> OrderDepth:
+    # What build_state did for every product before the books were OrderBooks
+    copied = OrderDepth()
+    copied.buy_orders = dict(order_depth.buy_orders)
+    copied.sell_orders = dict(order_depth.sell_orders)
+    return copied
+
+
+def scan_dicts(depths: List[OrderDepth]) -> int:
+    # What the strategies do every tick: sort both sides, read the best
+    # levels and sum the resting volume.
+    checksum = 0
+    for order_depth in depths:
+        bids = sorted(order_depth.buy_orders.items(), reverse=True)
+        asks = sorted(order_depth.sell_orders.items())
+        if bids:
+            checksum += bids[0][0]
+        if asks:
+            checksum += asks[0][0]
+        checksum += sum(volume for _, volume in bids)
+        checksum += sum(volume for _, volume in asks)
+    return checksum
+
+
+def scan_books(books: List[OrderBook]) -> int:
+    checksum = 0
+    for book in books:
+        if book.bid_keys:
+            checksum += book.best_bid
+        if book.ask_prices:
+            checksum += book.best_ask
+        checksum += book.bid_volume + book.ask_volume
+    return checksum
+
+
+def bench_orderbook(args: argparse.Namespace) -> None:
+    tick_day = load_day(args.round, args.day)
+    rows = tick_day.prices
+    levels = list(
+        zip(
+            rows["bid_price"].tolist(),
+            rows["bid_volume"].tolist(),
+            rows["ask_price"].tolist(),
+            rows["ask_volume"].tolist(),
+        )
+    )
+    print(
+        f"Order books, round {args.round} day {args.day}: {len(levels)} book rows, "
+        f"best of {args.repeat}"
+    )
+
+    depths = [dict_depth(*level) for level in levels]
+    books = [OrderBook.from_levels(*level) for level in levels]
+    if scan_dicts(depths) != scan_books(books):
+        raise AssertionError("OrderBook disagrees with the dict order depths")
+
+    report(
+        "build",
+        best_time(lambda: [dict_depth(*level) for level in levels], args.repeat),
+        best_time(
+            lambda: [OrderBook.from_levels(*level) for level in levels], args.repeat
+        ),
+    )
+    report(
+        "copy",
+        best_time(
+            lambda: [copy_depth(depth) for depth in depths],
+            args.repeat,
+        ),
+        best_time(lambda: [book.copy() for book in books], args.repeat),
+    )
+    report(
+        "best + depth",
+        best_time(lambda: scan_dicts(depths), args.repeat),
+        best_time(lambda: scan_books(books), args.repeat),
+    )
+
+
+def rss_bytes() -> int:
+    # Current resident set size, Linux only
+    with open("/proc/self/statm", "r") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def replay_objects(data: DayData, model) -> list:
+    # Every value object a full-day replay creates, kept alive the way a
+    # replay that records its history would keep them.
+    history = []
+    for timestamp in data.timestamps:
+        for product, book in data.books.get(timestamp, {}).items():
+            order_depth = model.OrderDepth()
+            order_depth.buy_orders = dict(book.buy_orders)
+            order_depth.sell_orders = dict(book.sell_orders)
+            history.append(order_depth)
+            history.append(model.Listing(product, product, "SEASHELLS"))
+        for symbol, price, quantity, buyer, seller in data.trades.get(timestamp, []):
+            history.append(
+                model.Trade(symbol, price, quantity, buyer, seller, timestamp)
+            )
+        for values in data.observations.get(timestamp, {}).values():
+            history.append(model.ConversionObservation(*values))
+    return history
+
+
+def bench_memory(args: argparse.Namespace) -> None:
+    data = DayData(args.round, args.day)
+    print(f"Value objects, round {args.round} day {args.day}")
+
+    models = (("dict", datamodel), ("slots", compact_datamodel))
+    for name, model in models:
+        gc.collect()
+        before = rss_bytes()
+        start = time.perf_counter()
+        history = replay_objects(data, model)
+        elapsed = time.perf_counter() - start
+        grown = rss_bytes() - before
+
+        tracemalloc.start()
+        traced = replay_objects(data, model)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"  {name:<6} {len(history):>8,} objects  "
+            f"{len(history) / elapsed / 1e6:5.2f}M allocs/s  "
+            f"traced {current / 2**20:7.1f}MiB  rss +{grown / 2**20:7.1f}MiB"
+        )
+        del history, traced
+
+    print(f"Backtest of {args.algorithm}")
+    for name, model in models:
+        trader = load_trader(args.algorithm)
+        gc.collect()
+        tracemalloc.start()
+        result = run_backtest(trader, data, compact=model is compact_datamodel)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"  {name:<6} {len(result.own_trades):>8,} fills  "
+            f"traced peak {peak / 2**20:7.1f}MiB  "
+            f"retained {current / 2**20:7.1f}MiB"
+        )
+
+
+class TwoPassLogger(trader.Logger):
+    def flush(self, state, orders, conversions, trader_data) -> None:
+        # The flush every trader used before it was made single-pass
+        base_length = len(
+            self.to_json(
+                [
+                    self.compress_state(state, ""),
+                    self.compress_orders(orders),
+                    conversions,
+                    "",
+                    "",
+                ]
+            )
+        )
+        max_item_length = (self.max_log_length - base_length) // 3
+        print(
+            self.to_json(
+                [
+                    self.compress_state(
+                        state, self.truncate(state.traderData, max_item_length)
+                    ),
+                    self.compress_orders(orders),
+                    conversions,
+                    self.truncate(trader_data, max_item_length),
+                    self.truncate(self.logs, max_item_length),
+                ]
+            )
+        )
+        self.logs = ""
+
+
+def synthetic_tick(products: int, timestamp: int, text: int):
+    symbols = [f"PRODUCT_{i}" for i in range(products)]
+    order_depths: Dict[str, OrderDepth] = {}
+    trades: Dict[str, List[Trade]] = {}
+    orders: Dict[str, List[Order]] = {}
+    for i, symbol in enumerate(symbols):
+        order_depth = OrderDepth()
+        order_depth.buy_orders = {1000 + i - level: 10 + level for level in range(3)}
+        order_depth.sell_orders = {1002 + i + level: -10 - level for level in range(3)}
+        order_depths[symbol] = order_depth
+        trades[symbol] = [Trade(symbol, 1001 + i, 2, "", "", timestamp - 100)]
+        orders[symbol] = [Order(symbol, 999 + i, 5), Order(symbol, 1003 + i, -5)]
+
+    listings = {
+        symbol: {"symbol": symbol, "product": symbol, "denomination": "SEASHELLS"}
+        for symbol in symbols
+    }
+    observations = Observation(
+        {},
+        {symbols[0]: ConversionObservation(1100.5, 1102.0, 1.5, 9.5, -3.0, 2500, 70)},
+    )
+    trader_data = "x" * text
+    state = TradingState(
+        trader_data, timestamp, listings, order_depths, trades, trades, {}, observations
+    )
+    return state, orders, trader_data
+
+
+def flush_output(logger, state, orders, trader_data, text: int) -> str:
+    logger.print("y" * text)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        logger.flush(state, orders, 1, trader_data)
+    return stdout.getvalue()
+
+
+def bench_flush(args: argparse.Namespace) -> None:
+    print(f"Logger.flush, best of {args.repeat} x {args.ticks} ticks")
+    # load_trader registers the module as "staub", which has its own Logger copy
+    load_trader(STAUB)
+    loggers = [trader.Logger(), sys.modules["staub"].Logger()]
+
+    for products in args.products:
+        for text in (0, 200, 5000):
+            tick = synthetic_tick(products, 123400, text)
+            expected = flush_output(TwoPassLogger(), *tick, text)
+            for logger in loggers:
+                if flush_output(logger, *tick, text) != expected:
+                    raise AssertionError(
+                        f"{type(logger).__module__}.Logger.flush output changed "
+                        f"for {products} products, {text} chars"
+                    )
+
+        state, orders, trader_data = synthetic_tick(products, 123400, 200)
+
+        def run(logger) -> Callable[[], None]:
+            def flush_ticks() -> None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(args.ticks):
+                        logger.print("y" * 200)
+                        logger.flush(state, orders, 1, trader_data)
+
+            return flush_ticks
+
+        report(
+            f"{products} products",
+            best_time(run(TwoPassLogger()), args.repeat) / args.ticks,
+            best_time(run(trader.Logger()), args.repeat) / args.ticks,
+            labels=("two-pass", "one-pass"),
+        )
+
+
+def bench_codec(args: argparse.Namespace) -> None:
+    # jsonpickle warns about its upcoming keys=True default on every encode
+    warnings.simplefilter("ignore", DeprecationWarning)
+    load_trader(STAUB)
+    print(f"traderData codecs, best of {args.repeat} x {args.ticks}")
+
+    strategy = trader.Trader()
+    prices = [5045.5, 5046.333333333333, 5044.0, 5047.25]
+    model = trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS)
+    for price in prices:
+        model.update(price)
+    trader_data = {
+        "AMETHYSTS": None,
+        "STARFRUIT": [prices, model.to_state()],
+        "ORCHIDS": [],
+    }
+    staub_data = sys.modules["staub"].RecordedData()
+    for _ in range(50):
+        staub_data.starfruit_trend.push(5040 + random.randint(0, 10) / 2)
+    cases = (
+        (
+            "trader.py",
+            trader_data,
+            strategy.serialize_trader_data,
+            strategy.deserialize_trader_data,
+        ),
+        ("staub.py", staub_data, type(staub_data).encode, type(staub_data).decode),
+    )
+
+    for name, value, encode, decode in cases:
+        pickled = jsonpickle.encode(value)
+        encoded = encode(value)
+        print(f"  {name}: {len(pickled)} chars with jsonpickle, {len(encoded)} now")
+
+        def repeat(function, argument) -> Callable[[], None]:
+            return lambda: [function(argument) for _ in range(args.ticks)]
+
+        report(
+            "encode",
+            best_time(repeat(jsonpickle.encode, value), args.repeat),
+            best_time(repeat(encode, value), args.repeat),
+            labels=("jsonpickle", "codec"),
+        )
+        report(
+            "decode",
+            best_time(repeat(jsonpickle.decode, pickled), args.repeat),
+            best_time(repeat(decode, encoded), args.repeat),
+            labels=("jsonpickle", "codec"),
+        )
+
+
+def starfruit_prices(round_num: int, day: int) -> List[float]:
+    # The per-tick VWAP mid trader.py feeds its STARFRUIT model
+    strategy = trader.Trader()
+    data = DayData(round_num, day)
+    prices = []
+    for timestamp in data.timestamps:
+        book = data.books[timestamp].get("STARFRUIT")
+        if book is not None and book.buy_orders and book.sell_orders:
+            prices.append(
+                (strategy.vwap(book.sell_orders) + strategy.vwap(book.buy_orders)) / 2
+            )
+    return prices
+
+
+def frozen_predictions(prices: List[float]) -> List[float | None]:
+    coefficients = trader.STARFRUIT_COEFFICIENTS
+    lags = len(coefficients) - 1
+    predictions: List[float | None] = [None] * lags
+    for i in range(lags, len(prices)):
+        predictions.append(
+            coefficients[0]
+            + sum(coefficients[k + 1] * prices[i - lags + k] for k in range(lags))
+        )
+    return predictions
+
+
+def rls_predictions(prices: List[float], serialize: bool) -> List[float | None]:
+    # serialize=True round-trips the model and its price window through
+    # traderData every tick, as trader.py does
+    model = trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS)
+    window: List[float] = []
+    predictions = []
+    for price in prices:
+        predictions.append(model.predict())
+        model.update(price)
+        if serialize:
+            window = (window + [price])[-model.lags :]
+            encoded = trader.TRADER_DATA_CODEC.encode(
+                {
+                    "AMETHYSTS": None,
+                    "STARFRUIT": [window, model.to_state()],
+                    "ORCHIDS": [],
+                }
+            )
+            window, model_state = trader.TRADER_DATA_CODEC.decode(encoded)["STARFRUIT"]
+            model = trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS)
+            model.load_state(model_state, window)
+    return predictions
+
+
+def prediction_errors(prices: List[float], predictions) -> np.ndarray:
+    return np.array(
+        [
+            prediction - price
+            for price, prediction in zip(prices, predictions)
+            if prediction is not None
+        ]
+    )
+
+
+def bench_rls(args: argparse.Namespace) -> None:
+    print("STARFRUIT next-mid prediction, frozen AR against online RLS")
+    for day in args.days:
+        prices = starfruit_prices(args.round, day)
+        frozen = frozen_predictions(prices)
+        online = rls_predictions(prices, serialize=False)
+        stored = rls_predictions(prices, serialize=True)
+
+        print(f"  round {args.round} day {day}, {len(prices)} ticks")
+        for name, predictions in (
+            ("frozen", frozen),
+            ("rls", online),
+            ("rls via traderData", stored),
+        ):
+            errors = prediction_errors(prices, predictions)
+            print(
+                f"    {name:<19} rmse {np.sqrt(np.mean(errors**2)):.4f}  "
+                f"mae {np.mean(np.abs(errors)):.4f}"
+            )
+        drift = max(
+            abs(restored - exact)
+            for exact, restored in zip(online, stored)
+            if exact is not None
+        )
+        print(f"    the rounded traderData state moves predictions by <= {drift:.4f}")
+
+        frozen_time = best_time(lambda: frozen_predictions(prices), args.repeat)
+        rls_time = best_time(lambda: rls_predictions(prices, False), args.repeat)
+        stored_time = best_time(lambda: rls_predictions(prices, True), args.repeat)
+        print(
+            f"    per tick frozen {frozen_time / len(prices) * 1e6:.2f}us  "
+            f"rls {rls_time / len(prices) * 1e6:.2f}us  "
+            f"rls via traderData {stored_time / len(prices) * 1e6:.2f}us"
+        )
+
+
+def lstsq_trend(cache: List[float]) -> float:
+    # staub.py's estimate before SlidingTrend
+    x = np.arange(len(cache))
+    A = np.vstack([x, np.ones(len(x))]).T
+    m, c = np.linalg.lstsq(A, np.array(cache), rcond=None)[0]
+    return len(cache) * m + c
+
+
+def best_mids(round_num: int, day: int, product: str) -> List[float]:
+    data = DayData(round_num, day)
+    mids = []
+    for timestamp in data.timestamps:
+        book = data.books[timestamp].get(product)
+        if book is not None and book.buy_orders and book.sell_orders:
+            mids.append((max(book.buy_orders) + min(book.sell_orders)) / 2)
+    return mids
+
+
+def bench_trend(args: argparse.Namespace) -> None:
+    load_trader(STAUB)
+    SlidingTrend = sys.modules["staub"].SlidingTrend
+    mids = best_mids(args.round, args.day, "STARFRUIT")
+
+    def with_lstsq() -> List[float]:
+        cache: List[float] = []
+        estimates = []
+        for mid in mids:
+            if len(cache) == args.size:
+                cache.pop(0)
+            cache.append(mid)
+            if len(cache) == args.size:
+                estimates.append(lstsq_trend(cache))
+        return estimates
+
+    def with_sums() -> List[float]:
+        trend = SlidingTrend(args.size)
+        estimates = []
+        for mid in mids:
+            trend.push(mid)
+            if trend.full():
+                estimates.append(trend.estimate())
+        return estimates
+
+    expected = np.array(with_lstsq())
+    actual = np.array(with_sums())
+    difference = np.abs(expected - actual).max()
+    rounded = int((np.round(expected) != np.round(actual)).sum())
+
+    print(
+        f"STARFRUIT trend over {args.size} mids, round {args.round} day {args.day}: "
+        f"{len(actual)} estimates, max difference {difference:.2e}, "
+        f"{rounded} differ after rounding (ties)"
+    )
+    report(
+        "full day",
+        best_time(with_lstsq, args.repeat),
+        best_time(with_sums, args.repeat),
+        labels=("lstsq", "sums"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the src tools")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    orderbook = subparsers.add_parser(
+        "orderbook", help="dict-and-sort order depths against OrderBook"
+    )
+    orderbook.add_argument("--round", type=int, default=3)
+    orderbook.add_argument("--day", type=int, default=0)
+    orderbook.add_argument("--repeat", type=int, default=5)
+    orderbook.set_defaults(run=bench_orderbook)
+
+    memory = subparsers.add_parser(
+        "memory", help="datamodel against compact_datamodel objects on a replay"
+    )
+    memory.add_argument("--round", type=int, default=3)
+    memory.add_argument("--day", type=int, default=0)
+    memory.add_argument(
+        "--algorithm",
+        default=os.path.join(SRC_DIR, "trader.py"),
+        help="trader to backtest while tracing",
+    )
+    memory.set_defaults(run=bench_memory)
+
+    flush = subparsers.add_parser(
+        "flush", help="per-tick Logger.flush cost, checked against the old output"
+    )
+    flush.add_argument("--products", type=int, nargs="+", default=[2, 8, 32])
+    flush.add_argument("--ticks", type=int, default=200)
+    flush.add_argument("--repeat", type=int, default=5)
+    flush.set_defaults(run=bench_flush)
+
+    codec = subparsers.add_parser(
+        "codec", help="traderData codec round trips and timing against jsonpickle"
+    )
+    codec.add_argument("--ticks", type=int, default=1000)
+    codec.add_argument("--repeat", type=int, default=5)
+    codec.set_defaults(run=bench_codec)
+
+    rls = subparsers.add_parser(
+        "rls", help="STARFRUIT frozen AR against the online RLS predictor"
+    )
+    rls.add_argument("--round", type=int, default=1)
+    rls.add_argument("--days", type=int, nargs="+", default=[-2, -1, 0])
+    rls.add_argument("--repeat", type=int, default=3)
+    rls.set_defaults(run=bench_rls)
+
+    trend = subparsers.add_parser(
+        "trend", help="staub.py SlidingTrend against the per-tick lstsq fit"
+    )
+    trend.add_argument("--round", type=int, default=1)
+    trend.add_argument("--day", type=int, default=0)
+    trend.add_argument("--size", type=int, default=38)
+    trend.add_argument("--repeat", type=int, default=3)
+    trend.set_defaults(run=bench_trend)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from typing import Dict
+
+import jsonpickle
+
+import datamodel
+from datamodel import ObservationValue, Product, Symbol, UserId
+
+# Drop-in replacements for the datamodel value classes with __slots__ instead
+# of a per-instance __dict__. Constructors, attributes and str/repr output are
+# the same; json.dumps(..., cls=ProsperityEncoder) and TradingState.toJSON
+# encode them through datamodel.object_fields.
+
+
+class Listing:
+    __slots__ = ("symbol", "product", "denomination")
+
+    def __init__(self, symbol: Symbol, product: Product, denomination: Product):
+        self.symbol = symbol
+        self.product = product
+        self.denomination = denomination
+
+
+class ConversionObservation:
+    __slots__ = (
+        "bidPrice",
+        "askPrice",
+        "transportFees",
+        "exportTariff",
+        "importTariff",
+        "sunlight",
+        "humidity",
+    )
+
+    def __init__(
+        self,
+        bidPrice: float,
+        askPrice: float,
+        transportFees: float,
+        exportTariff: float,
+        importTariff: float,
+        sunlight: float,
+        humidity: float,
+    ):
+        self.bidPrice = bidPrice
+        self.askPrice = askPrice
+        self.transportFees = transportFees
+        self.exportTariff = exportTariff
+        self.importTariff = importTariff
+        self.sunlight = sunlight
+        self.humidity = humidity
+
+
+class Observation:
+    __slots__ = ("plainValueObservations", "conversionObservations")
+
+    def __init__(
+        self,
+        plainValueObservations: Dict[Product, ObservationValue],
+        conversionObservations: Dict[Product, ConversionObservation],
+    ) -> None:
+        self.plainValueObservations = plainValueObservations
+        self.conversionObservations = conversionObservations
+
+    def __str__(self) -> str:
+        # jsonpickle tags objects with their class path, so encode datamodel
+        # copies to get the same py/object tags as datamodel.Observation
+        conversion_observations = {
+            product: datamodel.ConversionObservation(
+                *(getattr(observation, name) for name in observation.__slots__)
+            )
+            for product, observation in self.conversionObservations.items()
+        }
+        return (
+            "(plainValueObservations: "
+            + jsonpickle.encode(self.plainValueObservations)
+            + ", conversionObservations: "
+            + jsonpickle.encode(conversion_observations)
+            + ")"
+        )
+
+
+class Order:
+    __slots__ = ("symbol", "price", "quantity")
+
+    def __init__(self, symbol: Symbol, price: int, quantity: int) -> None:
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+
+    def __str__(self) -> str:
+        return (
+            "(" + self.symbol + ", " + str(self.price) + ", " + str(self.quantity) + ")"
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class OrderDepth:
+    __slots__ = ("buy_orders", "sell_orders")
+
+    def __init__(self):
+        self.buy_orders: Dict[int, int] = {}
+        self.sell_orders: Dict[int, int] = {}
+
+
+class Trade:
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
+    def __init__(
+        self,
+        symbol: Symbol,
+        price: int,
+        quantity: int,
+        buyer: UserId = None,
+        seller: UserId = None,
+        timestamp: int = 0,
+    ) -> None:
+        self.symbol = symbol
+        self.price: int = price
+        self.quantity: int = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return (
+            "("
+            + self.symbol
+            + ", "
+            + self.buyer
+            + " << "
+            + self.seller
+            + ", "
+            + str(self.price)
+            + ", "
+            + str(self.quantity)
+            + ", "
+            + str(self.timestamp)
+            + ")"
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,67 @@
+from typing import Dict, Tuple
+
+from datamodel import Symbol
+
+# per unit of net long position per timestamp, net short positions are free
+STORAGE_COSTS: Dict[Symbol, float] = {"ORCHIDS": 0.1}
+
+
+class ConversionSettler:
+    """
+    Settles the conversions returned by Trader.run against the south island
+    quotes of the same tick, and charges storage on net long positions.
+
+    Observations are the ConversionObservation fields as a tuple:
+    (bidPrice, askPrice, transportFees, exportTariff, importTariff, ...).
+    A request is rejected, as on the exchange, unless it reduces the current
+    position without flipping it: buying from the south covers a short at
+    ask + transport + import tariff, selling to the south reduces a long at
+    bid - transport - export tariff.
+    """
+
+    def __init__(self, storage_costs: Dict[Symbol, float] = STORAGE_COSTS) -> None:
+        self.storage_costs = storage_costs
+        self.cash: Dict[Symbol, float] = {}
+        self.converted: Dict[Symbol, int] = {}
+        self.fees: Dict[Symbol, float] = {}
+        self.storage: Dict[Symbol, float] = {}
+
+    def convert(
+        self,
+        conversions: int,
+        position: Dict[Symbol, int],
+        observations: Dict[Symbol, Tuple[float, ...]],
+    ) -> int:
+        """
+        Settle one tick's request, updating position in place. Returns the
+        units converted, positive when bought from the south.
+        """
+        # Trader.run returns a single count, it applies to the one product
+        # with a conversion observation.
+        if not conversions or len(observations) != 1:
+            return 0
+        ((product, observation),) = observations.items()
+        held = position.get(product, 0)
+        if held == 0 or (conversions > 0) == (held > 0) or abs(conversions) > abs(held):
+            return 0
+
+        bid, ask, transport_fees, export_tariff, import_tariff = observation[:5]
+        if conversions > 0:
+            fees = transport_fees + import_tariff
+            price = ask + fees
+        else:
+            fees = transport_fees + export_tariff
+            price = bid - fees
+
+        self.cash[product] = self.cash.get(product, 0.0) - conversions * price
+        self.fees[product] = self.fees.get(product, 0.0) + abs(conversions) * fees
+        self.converted[product] = self.converted.get(product, 0) + abs(conversions)
+        position[product] = held + conversions
+        return conversions
+
+    def charge_storage(self, position: Dict[Symbol, int]) -> None:
+        for product, cost in self.storage_costs.items():
+            held = position.get(product, 0)
+            if held > 0:
+                self.cash[product] = self.cash.get(product, 0.0) - held * cost
+                self.storage[product] = self.storage.get(product, 0.0) + held * cost
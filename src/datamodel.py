@@ -161,10 +161,21 @@ class TradingState(object):
         self.observations = observations
 
     def toJSON(self):
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True)
+        return json.dumps(self, default=object_fields, sort_keys=True)
+
+
+def object_fields(o) -> dict:
+    # Slotted classes (see compact_datamodel.py) have no __dict__
+    if hasattr(o, "__slots__"):
+        return {
+            name: getattr(o, name)
+            for cls in reversed(type(o).__mro__)
+            for name in cls.__dict__.get("__slots__", ())
+        }
+    return o.__dict__
 
 
 class ProsperityEncoder(JSONEncoder):
 
     def default(self, o):
-        return o.__dict__
+        return object_fields(o)
@@ -0,0 +1,199 @@
+import argparse
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tickstore import STORE_DIR, available_days, load_day, store_paths
+
+PRICE_DEFINITIONS = ("mid", "vwap", "best")
+
+# (product, lags, price definition) -> per-day (X, y), X without the intercept
+design_cache: Dict[Tuple[str, int, str], Dict[Tuple[int, int], tuple]] = {}
+
+
+def day_prices(rows: np.ndarray, definition: str) -> np.ndarray:
+    """One price per book row, NaN where a side of the book is empty."""
+    if definition == "mid":
+        prices = np.array(rows["mid_price"], dtype=np.float64)
+        prices[prices == 0] = np.nan
+        return prices
+
+    bid_prices = rows["bid_price"]
+    ask_prices = rows["ask_price"]
+    if definition == "best":
+        return (bid_prices[:, 0] + ask_prices[:, 0]) / 2
+
+    # the volume-weighted average of each side, as Trader.vwap computes it
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bid_volumes = np.where(np.isnan(bid_prices), 0, rows["bid_volume"])
+        ask_volumes = np.where(np.isnan(ask_prices), 0, rows["ask_volume"])
+        bid_vwap = np.nansum(bid_prices * bid_volumes, axis=1) / bid_volumes.sum(1)
+        ask_vwap = np.nansum(ask_prices * ask_volumes, axis=1) / ask_volumes.sum(1)
+    return (bid_vwap + ask_vwap) / 2
+
+
+def lagged(prices: np.ndarray, lags: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Row t of the window view is prices[t : t + lags + 1]: the lags oldest
+    # first, then the target. Windows touching a NaN are dropped.
+    if len(prices) <= lags:
+        return np.empty((0, lags)), np.empty(0)
+    windows = sliding_window_view(prices, lags + 1)
+    windows = windows[~np.isnan(windows).any(axis=1)]
+    return windows[:, :lags], windows[:, lags]
+
+
+def cache_path(product: str, lags: int, definition: str) -> str:
+    return os.path.join(STORE_DIR, f"ar_{product}_{lags}_{definition}.npz")
+
+
+def design_matrices(
+    product: str, lags: int, definition: str, days: List[Tuple[int, int]]
+) -> Dict[Tuple[int, int], tuple]:
+    """
+    Lagged design matrices per day for one product, cached in memory and as
+    an .npz next to the tick store, rebuilt when a day's store is newer.
+    """
+    key = (product, lags, definition)
+    cached = design_cache.setdefault(key, {})
+    missing = [day for day in days if day not in cached]
+    if not missing:
+        return {day: cached[day] for day in days}
+
+    # Every still-valid day in the archive, not just the missing ones: the
+    # archive is rewritten below and must keep the days archived earlier.
+    path = cache_path(product, lags, definition)
+    archived: Dict[Tuple[int, int], tuple] = {}
+    if os.path.exists(path):
+        built = os.path.getmtime(path)
+        with np.load(path) as archive:
+            for name in archive.files:
+                if not name.startswith("X_"):
+                    continue
+                round_num, day = map(int, name[2:].split("_"))
+                index = store_paths(round_num, day)["index"]
+                if os.path.exists(index) and os.path.getmtime(index) <= built:
+                    archived[(round_num, day)] = (
+                        archive[name],
+                        archive[f"y{name[1:]}"],
+                    )
+    for day in missing:
+        if day in archived:
+            cached[day] = archived[day]
+
+    built_days = [day for day in days if day not in cached]
+    for round_num, day in built_days:
+        tick_day = load_day(round_num, day)
+        prices = day_prices(tick_day.product_prices(product), definition)
+        cached[(round_num, day)] = lagged(prices, lags)
+    if not built_days:
+        return {day: cached[day] for day in days}
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    arrays = {}
+    for (round_num, day), (X, y) in {**archived, **cached}.items():
+        arrays[f"X_{round_num}_{day}"] = X
+        arrays[f"y_{round_num}_{day}"] = y
+    np.savez(path, **arrays)
+    return {day: cached[day] for day in days}
+
+
+def fit(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Least squares [intercept, oldest lag, ..., newest lag]."""
+    A = np.column_stack([np.ones(len(X)), X])
+    return np.linalg.lstsq(A, y, rcond=None)[0]
+
+
+def rmse(coefficients: np.ndarray, X: np.ndarray, y: np.ndarray) -> float:
+    predictions = coefficients[0] + X @ coefficients[1:]
+    return float(np.sqrt(np.mean((predictions - y) ** 2)))
+
+
+def fit_product(
+    product: str, lags: int, definition: str, days: List[Tuple[int, int]]
+) -> Tuple[np.ndarray, List[Tuple[Tuple[int, int], float]]]:
+    """
+    Fit on every day, plus leave-one-day-out fits scored on the held-out
+    day for the out-of-sample error.
+    """
+    matrices = design_matrices(product, lags, definition, days)
+    days = [day for day in days if len(matrices[day][1]) > 0]
+    if not days:
+        return np.empty(0), []
+
+    X = np.concatenate([matrices[day][0] for day in days])
+    y = np.concatenate([matrices[day][1] for day in days])
+    coefficients = fit(X, y)
+
+    errors = []
+    for held_out in days if len(days) > 1 else []:
+        train = [day for day in days if day != held_out]
+        train_coefficients = fit(
+            np.concatenate([matrices[day][0] for day in train]),
+            np.concatenate([matrices[day][1] for day in train]),
+        )
+        errors.append((held_out, rmse(train_coefficients, *matrices[held_out])))
+    return coefficients, errors
+
+
+def products_in(days: List[Tuple[int, int]]) -> List[str]:
+    products = set()
+    for round_num, day in days:
+        products.update(load_day(round_num, day).price_index)
+    return sorted(products)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fit AR fair-value models on the data bottle days"
+    )
+    parser.add_argument(
+        "products", nargs="*", help="products to fit (default: every product)"
+    )
+    parser.add_argument("--lags", type=int, nargs="+", default=[4])
+    parser.add_argument(
+        "--price",
+        nargs="+",
+        choices=PRICE_DEFINITIONS,
+        default=["vwap"],
+        help="mid: the logged mid_price, vwap: mean of the two side VWAPs "
+        "(trader.py), best: mean of the best bid and ask",
+    )
+    parser.add_argument(
+        "--rounds", type=int, nargs="+", help="rounds to use (default: all)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    days = [
+        (round_num, day)
+        for round_num, day in available_days()
+        if args.rounds is None or round_num in args.rounds
+    ]
+    products = args.products or products_in(days)
+
+    print("Coefficients are [intercept, oldest lag, ..., newest lag]")
+    for product in products:
+        for definition in args.price:
+            for lags in args.lags:
+                coefficients, errors = fit_product(product, lags, definition, days)
+                if len(coefficients) == 0:
+                    continue
+                held_out = ", ".join(
+                    f"{round_num}/{day}: {error:.4f}"
+                    for (round_num, day), error in errors
+                )
+                print(f"\n{product}, {definition} price, {lags} lags")
+                print(f"  out-of-sample rmse by held-out day  {held_out}")
+                print(
+                    f"  {product}_COEFFICIENTS = "
+                    f"[{', '.join(f'{value:.8f}' for value in coefficients)}]"
+                )
+
+    print(f"\nFitted in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
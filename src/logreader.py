@@ -0,0 +1,187 @@
+import json
+import math
+import sys
+import time
+from typing import Dict, Iterator, List, NamedTuple, Union
+
+import numpy as np
+
+SANDBOX = "Sandbox logs:"
+ACTIVITIES = "Activities log:"
+TRADE_HISTORY = "Trade History:"
+SECTIONS = (SANDBOX, ACTIVITIES, TRADE_HISTORY)
+
+
+class SandboxRecord(NamedTuple):
+    timestamp: int
+    sandbox_log: str
+    lambda_log: str
+
+
+class ActivityRow(NamedTuple):
+    day: int
+    timestamp: int
+    product: str
+    bid_price_1: float
+    bid_volume_1: float
+    bid_price_2: float
+    bid_volume_2: float
+    bid_price_3: float
+    bid_volume_3: float
+    ask_price_1: float
+    ask_volume_1: float
+    ask_price_2: float
+    ask_volume_2: float
+    ask_price_3: float
+    ask_volume_3: float
+    mid_price: float
+    profit_and_loss: float
+
+
+class TradeRecord(NamedTuple):
+    timestamp: int
+    buyer: str
+    seller: str
+    symbol: str
+    currency: str
+    price: float
+    quantity: int
+
+
+LogRecord = Union[SandboxRecord, ActivityRow, TradeRecord]
+
+
+def parse_object(lines: List[str]) -> dict:
+    # The exporter leaves a trailing comma after the last field of some
+    # objects, which json rejects, so drop it before decoding.
+    if len(lines) > 1 and lines[-2].endswith(","):
+        lines[-2] = lines[-2][:-1]
+    return json.loads("".join(lines))
+
+
+def parse_activity(fields: List[str]) -> ActivityRow:
+    values = [int(fields[0]), int(fields[1]), fields[2]]
+    values.extend(float(value) if value else math.nan for value in fields[3:17])
+    return ActivityRow(*values)
+
+
+def iter_log(path: str) -> Iterator[LogRecord]:
+    """
+    Read a submission/backtest log in a single pass, yielding its sandbox
+    records, activities rows and trade history entries in file order.
+    """
+    section = None
+    header_seen = False
+    buffer: List[str] = []
+    depth = 0
+
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+
+            # The trade history's closing bracket can be glued to the next
+            # section header when logs are concatenated.
+            for name in SECTIONS:
+                if line.endswith(name):
+                    section = name
+                    header_seen = False
+                    buffer = []
+                    depth = 0
+                    line = ""
+                    break
+
+            if not line:
+                continue
+
+            if section == ACTIVITIES:
+                if not header_seen:
+                    header_seen = True
+                    continue
+                yield parse_activity(line.split(";"))
+                continue
+
+            if section not in (SANDBOX, TRADE_HISTORY):
+                continue
+
+            if depth == 0:
+                if not line.startswith("{"):
+                    continue  # list brackets around the trade history
+                buffer = []
+
+            if line[0] == "{":
+                depth += 1
+            elif line[0] == "}":
+                depth -= 1
+                line = "}"  # drops "}," separators and a "}]" list close
+            buffer.append(line)
+            if depth > 0:
+                continue
+
+            entry = parse_object(buffer)
+            if section == SANDBOX:
+                yield SandboxRecord(
+                    entry.get("timestamp", 0),
+                    entry.get("sandboxLog", ""),
+                    entry.get("lambdaLog", ""),
+                )
+            else:
+                yield TradeRecord(
+                    entry["timestamp"],
+                    entry.get("buyer", ""),
+                    entry.get("seller", ""),
+                    entry["symbol"],
+                    entry.get("currency", "SEASHELLS"),
+                    entry["price"],
+                    entry["quantity"],
+                )
+
+
+class ParsedLog:
+    def __init__(self) -> None:
+        self.sandbox: List[SandboxRecord] = []
+        self.activities: Dict[str, np.ndarray] = {}
+        self.trades: Dict[str, np.ndarray] = {}
+
+
+def columns(records: List[NamedTuple], fields, dtypes) -> Dict[str, np.ndarray]:
+    if not records:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in zip(fields, dtypes)}
+    transposed = zip(*records)
+    return {
+        name: np.array(values, dtype=dtype)
+        for name, values, dtype in zip(fields, transposed, dtypes)
+    }
+
+
+ACTIVITY_DTYPES = [np.int64, np.int64, object] + [np.float64] * 14
+TRADE_DTYPES = [np.int64, object, object, object, object, np.float64, np.int64]
+
+
+def read_log(path: str) -> ParsedLog:
+    """Read a whole log into sandbox records plus columnar activities/trades."""
+    parsed = ParsedLog()
+    activities = []
+    trades = []
+    for record in iter_log(path):
+        if type(record) is ActivityRow:
+            activities.append(record)
+        elif type(record) is TradeRecord:
+            trades.append(record)
+        else:
+            parsed.sandbox.append(record)
+
+    parsed.activities = columns(activities, ActivityRow._fields, ACTIVITY_DTYPES)
+    parsed.trades = columns(trades, TradeRecord._fields, TRADE_DTYPES)
+    return parsed
+
+
+if __name__ == "__main__":
+    for log_path in sys.argv[1:]:
+        start = time.perf_counter()
+        parsed = read_log(log_path)
+        print(
+            f"{log_path}: {len(parsed.sandbox)} sandbox records, "
+            f"{len(parsed.activities['timestamp'])} activities, "
+            f"{len(parsed.trades['timestamp'])} trades "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
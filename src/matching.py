@@ -0,0 +1,185 @@
+from typing import Dict, Iterable, List, Tuple
+
+from datamodel import Order, OrderDepth, Symbol, Trade
+from orderbook import OrderBook
+
+POSITION_LIMITS = {
+    "AMETHYSTS": 20,
+    "STARFRUIT": 20,
+    "ORCHIDS": 100,
+    "CHOCOLATE": 250,
+    "STRAWBERRIES": 350,
+    "ROSES": 60,
+    "GIFT_BASKET": 60,
+}
+
+SUBMISSION = "SUBMISSION"
+
+
+class PriceLadder:
+    """
+    One side of a book as parallel price/volume lists, best level first.
+    Levels are consumed from the head, so a sweep over all of our orders
+    touches each level at most once.
+    """
+
+    def __init__(self, prices: List[int], volumes: List[int], descending: bool) -> None:
+        self.prices = prices
+        self.volumes = volumes
+        # asks cross when level <= limit, bids when level >= limit
+        self.sign = -1 if descending else 1
+        self.head = 0
+
+    @classmethod
+    def bids(cls, order_depth: OrderDepth) -> "PriceLadder":
+        if isinstance(order_depth, OrderBook):
+            return cls(
+                [-key for key in order_depth.bid_keys], order_depth.bid_volumes[:], True
+            )
+        prices = sorted(order_depth.buy_orders, reverse=True)
+        return cls(prices, [order_depth.buy_orders[price] for price in prices], True)
+
+    @classmethod
+    def asks(cls, order_depth: OrderDepth) -> "PriceLadder":
+        if isinstance(order_depth, OrderBook):
+            return cls(
+                order_depth.ask_prices,
+                [-volume for volume in order_depth.ask_volumes],
+                False,
+            )
+        prices = sorted(order_depth.sell_orders)
+        return cls(prices, [-order_depth.sell_orders[price] for price in prices], False)
+
+    def take(self, limit_price: int, quantity: int) -> List[Tuple[int, int]]:
+        filled = []
+        while quantity > 0 and self.head < len(self.prices):
+            price = self.prices[self.head]
+            if self.sign * price > self.sign * limit_price:
+                break
+            volume = min(quantity, self.volumes[self.head])
+            filled.append((price, volume))
+            quantity -= volume
+            self.volumes[self.head] -= volume
+            if self.volumes[self.head] == 0:
+                self.head += 1
+        return filled
+
+
+def exceeds_limit(orders: List[Order], position: int, limit: int) -> bool:
+    # The exchange rejects every order of a product if filling all of its buys
+    # (or all of its sells) could take the position past the limit.
+    total_buy = sum(order.quantity for order in orders if order.quantity > 0)
+    total_sell = sum(-order.quantity for order in orders if order.quantity < 0)
+    return position + total_buy > limit or position - total_sell < -limit
+
+
+def match_product(
+    timestamp: int,
+    product: Symbol,
+    order_depth: OrderDepth,
+    orders: List[Order],
+    position: int,
+    limit: int,
+    market_trades: Iterable[Trade] = (),
+    trade_class: type = Trade,
+) -> Tuple[List[Trade], int]:
+    """
+    Fill one product's orders with price-time priority, first against the
+    visible book and then against the market trades of the same tick. Market
+    trades are filled at our price and have their quantity reduced in place.
+    """
+    if exceeds_limit(orders, position, limit):
+        return [], position
+
+    fills: List[Trade] = []
+    market_trades = [trade for trade in market_trades if trade.quantity > 0]
+
+    # sorted() is stable, so equal prices keep submission order
+    buys = sorted(
+        (order for order in orders if order.quantity > 0), key=lambda o: -o.price
+    )
+    asks = PriceLadder.asks(order_depth)
+    for order in buys:
+        remaining = order.quantity
+        for price, volume in asks.take(order.price, remaining):
+            fills.append(trade_class(product, price, volume, SUBMISSION, "", timestamp))
+            remaining -= volume
+
+        for trade in market_trades:
+            if remaining == 0:
+                break
+            if trade.quantity == 0 or trade.price > order.price:
+                continue
+            volume = min(remaining, trade.quantity)
+            fills.append(
+                trade_class(
+                    product, order.price, volume, SUBMISSION, trade.seller, timestamp
+                )
+            )
+            trade.quantity -= volume
+            remaining -= volume
+
+        position += order.quantity - remaining
+
+    sells = sorted(
+        (order for order in orders if order.quantity < 0), key=lambda o: o.price
+    )
+    bids = PriceLadder.bids(order_depth)
+    for order in sells:
+        remaining = -order.quantity
+        for price, volume in bids.take(order.price, remaining):
+            fills.append(trade_class(product, price, volume, "", SUBMISSION, timestamp))
+            remaining -= volume
+
+        for trade in market_trades:
+            if remaining == 0:
+                break
+            if trade.quantity == 0 or trade.price < order.price:
+                continue
+            volume = min(remaining, trade.quantity)
+            fills.append(
+                trade_class(
+                    product, order.price, volume, trade.buyer, SUBMISSION, timestamp
+                )
+            )
+            trade.quantity -= volume
+            remaining -= volume
+
+        position -= -order.quantity - remaining
+
+    return fills, position
+
+
+def match_orders(
+    timestamp: int,
+    order_depths: Dict[Symbol, OrderDepth],
+    orders: Dict[Symbol, List[Order]],
+    position: Dict[Symbol, int],
+    market_trades: Dict[Symbol, List[Trade]] | None = None,
+    limits: Dict[Symbol, int] = POSITION_LIMITS,
+    trade_class: type = Trade,
+) -> Tuple[List[Trade], Dict[Symbol, int]]:
+    """
+    Match a tick's orders for every product, returning fills and new positions.
+    The quantities of market_trades are reduced in place by what we take.
+    """
+    fills: List[Trade] = []
+    new_position = dict(position)
+    market_trades = market_trades or {}
+
+    for product, product_orders in orders.items():
+        if not product_orders:
+            continue
+        product_fills, new_position[product] = match_product(
+            timestamp,
+            product,
+            order_depths.get(product, OrderDepth()),
+            product_orders,
+            position.get(product, 0),
+            limits.get(product, 20),
+            market_trades.get(product, ()),
+            trade_class,
+        )
+        fills.extend(product_fills)
+
+    return fills, new_position
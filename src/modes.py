@@ -36,6 +36,7 @@ class Trader:
     starfruit_cache = []
     coconuts_cache = []
     starfruit_dim = 4
+    steps = 0
     buy_orchids = False
     sell_orchids = False
     sunlight_value = 0
@@ -317,8 +318,8 @@ class Trader:
 
     # RUN function, Only method required. It takes all buy and sell orders for all symbols as an input, and outputs a list of orders to be sent
     def run(self, state: TradingState) -> Dict[str, List[Order]]:
-        # Initialize the method output dict as an empty dict
-        result = {"AMETHYSTS": [], "STARFRUIT": [], "ORCHIDS": []}
+        # Orders only for the products with a book this tick
+        result = {}
 
         # Iterate over all the keys (the available products) contained in the order dephts
         for key, val in state.position.items():
@@ -329,22 +330,25 @@ class Trader:
 
         timestamp = state.timestamp
 
-        if len(self.starfruit_cache) == self.starfruit_dim:
-            self.starfruit_cache.pop(0)
+        if "STARFRUIT" in state.order_depths:
+            if len(self.starfruit_cache) == self.starfruit_dim:
+                self.starfruit_cache.pop(0)
 
-        _, bs_starfruit = self.values_extract(
-            collections.OrderedDict(
-                sorted(state.order_depths["STARFRUIT"].sell_orders.items())
+            _, bs_starfruit = self.values_extract(
+                collections.OrderedDict(
+                    sorted(state.order_depths["STARFRUIT"].sell_orders.items())
+                )
+            )
+            _, bb_starfruit = self.values_extract(
+                collections.OrderedDict(
+                    sorted(
+                        state.order_depths["STARFRUIT"].buy_orders.items(), reverse=True
+                    )
+                ),
+                1,
             )
-        )
-        _, bb_starfruit = self.values_extract(
-            collections.OrderedDict(
-                sorted(state.order_depths["STARFRUIT"].buy_orders.items(), reverse=True)
-            ),
-            1,
-        )
 
-        self.starfruit_cache.append((bs_starfruit + bb_starfruit) / 2)
+            self.starfruit_cache.append((bs_starfruit + bb_starfruit) / 2)
 
         INF = 1e9
 
@@ -380,22 +384,27 @@ class Trader:
                 self.person_actvalof_position[trade.buyer][product] += trade.quantity
                 self.person_actvalof_position[trade.seller][product] += -trade.quantity
 
-        orders = self.compute_orders_orchids(state.order_depths, state.observations)
-        result["ORCHIDS"] += orders["ORCHIDS"]
+        if "ORCHIDS" in state.order_depths:
+            orders = self.compute_orders_orchids(state.order_depths, state.observations)
+            result["ORCHIDS"] = orders["ORCHIDS"]
 
         for product in ["AMETHYSTS", "STARFRUIT"]:
+            if product not in state.order_depths:
+                continue
             order_depth: OrderDepth = state.order_depths[product]
             orders = self.compute_orders(
                 product, order_depth, acc_bid[product], acc_ask[product]
             )
-            result[product] += orders
+            result[product] = orders
 
         for product in state.own_trades.keys():
             for trade in state.own_trades[product]:
                 if trade.timestamp != state.timestamp - 100:
                     continue
                 # print(f'We are trading {product}, {trade.buyer}, {trade.seller}, {trade.quantity}, {trade.price}')
-                self.volume_traded[product] += abs(trade.quantity)
+                self.volume_traded[product] = self.volume_traded.get(product, 0) + abs(
+                    trade.quantity
+                )
                 if trade.buyer == "SUBMISSION":
                     self.cpnl[product] -= trade.quantity * trade.price
                 else:
@@ -405,16 +414,14 @@ class Trader:
 
         for product in state.order_depths.keys():
             settled_pnl = 0
-            best_sell = min(state.order_depths[product].sell_orders.keys())
-            best_buy = max(state.order_depths[product].buy_orders.keys())
-
-            if self.position[product] < 0:
-                settled_pnl += self.position[product] * best_buy
-            else:
-                settled_pnl += self.position[product] * best_sell
+            position = self.position.get(product, 0)
+            if position < 0 and state.order_depths[product].buy_orders:
+                settled_pnl += position * max(state.order_depths[product].buy_orders)
+            elif position > 0 and state.order_depths[product].sell_orders:
+                settled_pnl += position * min(state.order_depths[product].sell_orders)
             totpnl += settled_pnl + self.cpnl[product]
             print(
-                f"For product {product}, {settled_pnl + self.cpnl[product]}, {(settled_pnl+self.cpnl[product])/(self.volume_traded[product]+1e-20)}"
+                f"For product {product}, {settled_pnl + self.cpnl[product]}, {(settled_pnl+self.cpnl[product])/(self.volume_traded.get(product, 0)+1e-20)}"
             )
 
         print(f"Timestamp {timestamp}, Total PNL ended up being {totpnl}")
@@ -0,0 +1,263 @@
+import argparse
+import csv
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from logreader import read_log
+from tickstore import LEVELS, available_days, load_day
+
+ROUND = 2
+POSITION_LIMIT = 100
+# per unit of net long ORCHIDS per timestamp, short positions are free
+STORAGE_COST = 0.1
+
+SOUTH_COLUMNS = [
+    "timestamp",
+    "south_bid",
+    "south_ask",
+    "import_cost",
+    "export_proceeds",
+    "round_trip",
+]
+NORTH_COLUMNS = [
+    "north_bid",
+    "north_ask",
+    "import_edge",
+    "import_volume",
+    "import_profit",
+    "export_edge",
+    "export_volume",
+    "export_profit",
+    "maker_edge",
+]
+
+
+def south_columns(
+    observations: np.ndarray, half_spread: float
+) -> Dict[str, np.ndarray]:
+    """
+    The landed price of one unit imported from the south (ask + import
+    tariff + transport) and the proceeds of one unit exported to it
+    (bid - export tariff - transport). The data bottles carry a single
+    south price, quoted here as +-half_spread around it.
+    """
+    price = np.asarray(observations["orchids"], dtype=np.float64)
+    transport = np.asarray(observations["transport_fees"], dtype=np.float64)
+    south_bid = price - half_spread
+    south_ask = price + half_spread
+    import_cost = south_ask + observations["import_tariff"] + transport
+    export_proceeds = south_bid - observations["export_tariff"] - transport
+    return {
+        "timestamp": np.asarray(observations["timestamp"], dtype=np.int64),
+        "south_bid": south_bid,
+        "south_ask": south_ask,
+        "import_cost": import_cost,
+        "export_proceeds": export_proceeds,
+        "round_trip": import_cost - export_proceeds,
+    }
+
+
+def north_books(log_paths: List[str]) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    ORCHIDS books per day from submission/backtest logs, best level first.
+    When several logs cover a day the last one is used.
+    """
+    books: Dict[int, Dict[str, np.ndarray]] = {}
+    for path in log_paths:
+        activities = read_log(path).activities
+        orchids = activities["product"] == "ORCHIDS"
+        for day in np.unique(activities["day"][orchids]):
+            rows = orchids & (activities["day"] == day)
+            book = {"timestamp": activities["timestamp"][rows]}
+            for side in ("bid", "ask"):
+                book[f"{side}_price"] = np.column_stack(
+                    [
+                        activities[f"{side}_price_{i}"][rows]
+                        for i in range(1, LEVELS + 1)
+                    ]
+                )
+                volumes = np.column_stack(
+                    [
+                        activities[f"{side}_volume_{i}"][rows]
+                        for i in range(1, LEVELS + 1)
+                    ]
+                )
+                book[f"{side}_volume"] = np.nan_to_num(np.abs(volumes))
+            books[int(day)] = book
+    return books
+
+
+def taker_edge(
+    edges: np.ndarray, volumes: np.ndarray, limit: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per tick: the edge at the best level, and the volume and profit of taking
+    every level with a positive edge, best first, up to the position limit.
+    """
+    available = np.where(edges > 0, volumes, 0.0)
+    before = np.cumsum(available, axis=1) - available
+    taken = np.clip(limit - before, 0, available)
+    profit = np.nansum(np.where(taken > 0, edges * taken, 0.0), axis=1)
+    return edges[:, 0], taken.sum(axis=1), profit
+
+
+def analyze_day(
+    day: int,
+    half_spread: float = 0.0,
+    book: Dict[str, np.ndarray] | None = None,
+    limit: int = POSITION_LIMIT,
+) -> Dict[str, np.ndarray]:
+    """
+    One column per quantity, one row per observation. North columns are NaN
+    on ticks without a north book:
+      import: sell into the north bids, cover by importing (no storage)
+      export: lift the north asks, export a tick later (one tick of storage)
+      maker: an ask one tick inside the north best ask, covered by importing
+    """
+    columns = south_columns(load_day(ROUND, day).observations, half_spread)
+    n = len(columns["timestamp"])
+    for name in NORTH_COLUMNS:
+        columns[name] = np.full(n, np.nan)
+    if book is None:
+        return columns
+
+    rows = np.searchsorted(columns["timestamp"], book["timestamp"])
+    rows = np.minimum(rows, n - 1)
+    found = columns["timestamp"][rows] == book["timestamp"]
+    rows = rows[found]
+    bid_prices, bid_volumes = book["bid_price"][found], book["bid_volume"][found]
+    ask_prices, ask_volumes = book["ask_price"][found], book["ask_volume"][found]
+
+    import_cost = columns["import_cost"][rows, None]
+    export_proceeds = columns["export_proceeds"][rows, None] - STORAGE_COST
+    imports = taker_edge(bid_prices - import_cost, bid_volumes, limit)
+    exports = taker_edge(export_proceeds - ask_prices, ask_volumes, limit)
+
+    columns["north_bid"][rows] = bid_prices[:, 0]
+    columns["north_ask"][rows] = ask_prices[:, 0]
+    for side, (edge, volume, profit) in (("import", imports), ("export", exports)):
+        columns[f"{side}_edge"][rows] = edge
+        columns[f"{side}_volume"][rows] = volume
+        columns[f"{side}_profit"][rows] = profit
+    columns["maker_edge"][rows] = ask_prices[:, 0] - 1 - import_cost[:, 0]
+    return columns
+
+
+def summarize(columns: Dict[str, np.ndarray]) -> Dict[str, float]:
+    summary = {
+        "ticks": len(columns["timestamp"]),
+        "import_cost_vs_south": float(
+            np.mean(columns["import_cost"] - columns["south_ask"])
+        ),
+        "round_trip": float(np.mean(columns["round_trip"])),
+    }
+    booked = ~np.isnan(columns["north_bid"])
+    summary["booked_ticks"] = int(booked.sum())
+    for side in ("import", "export"):
+        edge = columns[f"{side}_edge"][booked]
+        profit = columns[f"{side}_profit"][booked]
+        summary[f"{side}_ticks"] = int((profit > 0).sum())
+        summary[f"{side}_best_edge"] = float(edge.max()) if len(edge) else np.nan
+        summary[f"{side}_profit"] = float(profit.sum())
+    maker = columns["maker_edge"][booked]
+    summary["maker_ticks"] = int((maker > 0).sum())
+    summary["maker_mean_edge"] = float(maker.mean()) if len(maker) else np.nan
+    return summary
+
+
+def windows(columns: Dict[str, np.ndarray], count: int) -> List[Tuple[int, int, float]]:
+    """(first timestamp, ticks with taker edge, taker profit) per window of the day."""
+    profit = np.nan_to_num(columns["import_profit"]) + np.nan_to_num(
+        columns["export_profit"]
+    )
+    rows = []
+    for chunk, timestamps in zip(
+        np.array_split(profit, count), np.array_split(columns["timestamp"], count)
+    ):
+        if len(chunk):
+            rows.append(
+                (int(timestamps[0]), int((chunk > 0).sum()), float(chunk.sum()))
+            )
+    return rows
+
+
+def write_columns(path: str, days: Dict[int, Dict[str, np.ndarray]]) -> None:
+    names = SOUTH_COLUMNS + NORTH_COLUMNS
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["day"] + names)
+        for day, columns in days.items():
+            table = np.column_stack([columns[name] for name in names])
+            writer.writerows([day, int(row[0])] + row[1:] for row in table.tolist())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Where does ORCHIDS conversion arbitrage against the south exist"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        nargs="+",
+        help="round 2 days (default: every day in the data bottles)",
+    )
+    parser.add_argument(
+        "--books",
+        nargs="*",
+        default=[],
+        help="submission/backtest logs whose ORCHIDS books are matched by day "
+        "and timestamp (the data bottles have no north book)",
+    )
+    parser.add_argument(
+        "--south-spread",
+        type=float,
+        default=0.0,
+        help="half spread around the single south price, as the backtester uses 0",
+    )
+    parser.add_argument("--windows", type=int, default=10)
+    parser.add_argument("--out", help="write every per-tick column to this CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    days = args.days or [day for round_num, day in available_days() if round_num == 2]
+    books = north_books(args.books)
+    results = {day: analyze_day(day, args.south_spread, books.get(day)) for day in days}
+
+    for day, columns in results.items():
+        summary = summarize(columns)
+        print(f"\nround {ROUND} day {day}: {summary['ticks']} ticks")
+        print(
+            f"  import costs {summary['import_cost_vs_south']:+.2f} vs the south ask, "
+            f"a south round trip costs {summary['round_trip']:.2f}"
+        )
+        if not summary["booked_ticks"]:
+            print("  no north book for this day, pass a log with --books")
+            continue
+        print(f"  {summary['booked_ticks']} ticks with a north book")
+        for side, action in (
+            ("import", "sell north, import"),
+            ("export", "buy north, export"),
+        ):
+            print(
+                f"  {action:<20} edge on {summary[f'{side}_ticks']:>6} ticks, "
+                f"best {summary[f'{side}_best_edge']:+.2f}, "
+                f"taker profit {summary[f'{side}_profit']:.1f}"
+            )
+        print(
+            f"  {'maker ask, import':<20} edge on {summary['maker_ticks']:>6} ticks, "
+            f"mean {summary['maker_mean_edge']:+.2f}"
+        )
+        booked = ~np.isnan(columns["north_bid"])
+        booked_columns = {name: values[booked] for name, values in columns.items()}
+        for first, ticks, profit in windows(booked_columns, args.windows):
+            print(f"    from {first:>7}: {ticks:>5} ticks with edge, {profit:9.1f}")
+
+    if args.out:
+        write_columns(args.out, results)
+    print(f"\nAnalyzed in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
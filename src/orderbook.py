@@ -0,0 +1,160 @@
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from datamodel import OrderDepth
+
+
+class OrderBook(OrderDepth):
+    """
+    An OrderDepth that keeps its levels sorted best-first. buy_orders and
+    sell_orders stay plain dicts (inserted in best-first order, so iterating
+    them or sorting them again is already cheap); the parallel price/volume
+    lists give O(1) best prices and totals and O(k) level iteration.
+    Update levels through set_bid/set_ask so the two views stay in sync.
+    The level lists are never mutated in place, so copies share them.
+    """
+
+    def __init__(
+        self,
+        buy_orders: Dict[int, int] | None = None,
+        sell_orders: Dict[int, int] | None = None,
+    ) -> None:
+        super().__init__()
+        # bid prices are stored negated so both sides are ascending for bisect
+        self.bid_keys: List[int] = []
+        self.bid_volumes: List[int] = []
+        self.ask_prices: List[int] = []
+        self.ask_volumes: List[int] = []
+        self.bid_total = 0
+        self.ask_total = 0
+
+        if buy_orders:
+            self.bid_keys = sorted(-price for price in buy_orders)
+            self.bid_volumes = [buy_orders[-key] for key in self.bid_keys]
+            self.bid_total = sum(self.bid_volumes)
+        if sell_orders:
+            self.ask_prices = sorted(sell_orders)
+            self.ask_volumes = [sell_orders[price] for price in self.ask_prices]
+            self.ask_total = sum(self.ask_volumes)
+        self.rebuild_dicts()
+
+    @classmethod
+    def from_levels(
+        cls,
+        bid_prices: Sequence[float],
+        bid_volumes: Sequence[int],
+        ask_prices: Sequence[float],
+        ask_volumes: Sequence[int],
+    ) -> "OrderBook":
+        """Build from best-first level arrays, NaN or empty prices mark missing levels."""
+        book = cls.__new__(cls)
+        bids = [
+            (int(price), int(volume))
+            for price, volume in zip(bid_prices, bid_volumes)
+            if price == price and price != ""
+        ]
+        asks = [
+            (int(price), -abs(int(volume)))
+            for price, volume in zip(ask_prices, ask_volumes)
+            if price == price and price != ""
+        ]
+        book.bid_keys = [-price for price, _ in bids]
+        book.bid_volumes = [volume for _, volume in bids]
+        book.ask_prices = [price for price, _ in asks]
+        book.ask_volumes = [volume for _, volume in asks]
+        book.bid_total = sum(book.bid_volumes)
+        book.ask_total = sum(book.ask_volumes)
+        book.buy_orders = dict(bids)
+        book.sell_orders = dict(asks)
+        return book
+
+    @classmethod
+    def from_csv_row(cls, row: Sequence[str]) -> "OrderBook":
+        """Build from a split prices CSV or Activities log row."""
+        return cls.from_levels(row[3:9:2], row[4:9:2], row[9:15:2], row[10:15:2])
+
+    @classmethod
+    def from_record(cls, record) -> "OrderBook":
+        """Build from a tick store price row or a logreader ActivityRow."""
+        if hasattr(record, "bid_price_1"):
+            return cls.from_levels(
+                (record.bid_price_1, record.bid_price_2, record.bid_price_3),
+                (record.bid_volume_1, record.bid_volume_2, record.bid_volume_3),
+                (record.ask_price_1, record.ask_price_2, record.ask_price_3),
+                (record.ask_volume_1, record.ask_volume_2, record.ask_volume_3),
+            )
+        return cls.from_levels(
+            record["bid_price"].tolist(),
+            record["bid_volume"].tolist(),
+            record["ask_price"].tolist(),
+            record["ask_volume"].tolist(),
+        )
+
+    def copy(self) -> "OrderBook":
+        book = OrderBook.__new__(OrderBook)
+        attributes = self.__dict__.copy()
+        attributes["buy_orders"] = self.buy_orders.copy()
+        attributes["sell_orders"] = self.sell_orders.copy()
+        book.__dict__ = attributes
+        return book
+
+    def rebuild_dicts(self) -> None:
+        self.buy_orders = {
+            -key: volume for key, volume in zip(self.bid_keys, self.bid_volumes)
+        }
+        self.sell_orders = dict(zip(self.ask_prices, self.ask_volumes))
+
+    @property
+    def best_bid(self) -> int | None:
+        return -self.bid_keys[0] if self.bid_keys else None
+
+    @property
+    def best_ask(self) -> int | None:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    @property
+    def bid_volume(self) -> int:
+        return self.bid_total
+
+    @property
+    def ask_volume(self) -> int:
+        """Total resting ask volume, negative like the sell_orders values."""
+        return self.ask_total
+
+    def bids(self) -> Iterator[Tuple[int, int]]:
+        return ((-key, volume) for key, volume in zip(self.bid_keys, self.bid_volumes))
+
+    def asks(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.ask_prices, self.ask_volumes)
+
+    def set_bid(self, price: int, volume: int) -> None:
+        """Set the resting volume at a bid price, zero removes the level."""
+        self.bid_keys = self.bid_keys[:]
+        self.bid_volumes = self.bid_volumes[:]
+        self.bid_total += set_level(self.bid_keys, self.bid_volumes, -price, volume)
+        self.rebuild_dicts()
+
+    def set_ask(self, price: int, volume: int) -> None:
+        """Set the resting volume at an ask price (negative), zero removes the level."""
+        self.ask_prices = self.ask_prices[:]
+        self.ask_volumes = self.ask_volumes[:]
+        self.ask_total += set_level(self.ask_prices, self.ask_volumes, price, volume)
+        self.rebuild_dicts()
+
+
+def set_level(keys: List[int], volumes: List[int], key: int, volume: int) -> int:
+    # Returns the change in total volume on this side.
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        change = volume - volumes[i]
+        if volume == 0:
+            del keys[i]
+            del volumes[i]
+        else:
+            volumes[i] = volume
+        return change
+
+    if volume != 0:
+        keys.insert(i, key)
+        volumes.insert(i, volume)
+    return volume
@@ -0,0 +1,120 @@
+import csv
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Trader method -> where its product comes from: the index of a positional
+# argument, a fixed product name, or None when the phase covers every product.
+PHASES: Dict[str, int | str | None] = {
+    "run": None,
+    "deserialize_trader_data": None,
+    "run_strategy": 0,
+    "update_price_history": 2,
+    "generate_orders": 1,
+    "generate_orchid_orders": "ORCHIDS",
+    "serialize_trader_data": None,
+}
+
+ALL_PRODUCTS = "*"
+SUMMARY_FIELDS = ["phase", "product", "calls", "p50_us", "p99_us", "max_us", "total_ms"]
+
+
+class Profiler:
+    """
+    Times the phases of Trader.run by wrapping the trader's methods on the
+    instance (and the flush of its module's logger). Nothing is wrapped until
+    attach() is called, so an unprofiled run pays nothing.
+    """
+
+    def __init__(self, phases: Dict[str, int | str | None] = PHASES) -> None:
+        self.phases = phases
+        self.samples: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self.attached: List[Tuple[Any, str]] = []
+
+    def attach(self, trader) -> None:
+        for name, product in self.phases.items():
+            method = getattr(trader, name, None)
+            if method is not None:
+                self.wrap(trader, name, method, product)
+
+        logger = getattr(sys.modules.get(type(trader).__module__), "logger", None)
+        if logger is not None and hasattr(logger, "flush"):
+            self.wrap(logger, "flush", logger.flush, None, phase="logger.flush")
+
+    def detach(self) -> None:
+        for owner, name in self.attached:
+            delattr(owner, name)
+        self.attached = []
+
+    def wrap(
+        self,
+        owner,
+        name: str,
+        method: Callable,
+        product: int | str | None,
+        phase: str | None = None,
+    ) -> None:
+        samples = self.samples
+        phase = phase or name
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                if product is None:
+                    key = ALL_PRODUCTS
+                elif isinstance(product, str):
+                    key = product
+                else:
+                    key = args[product] if len(args) > product else ALL_PRODUCTS
+                samples[(phase, key)].append(elapsed)
+
+        setattr(owner, name, timed)
+        self.attached.append((owner, name))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        rows = []
+        for (phase, product), samples in self.samples.items():
+            micros = np.array(samples, dtype=np.float64) / 1e3
+            p50, p99 = np.percentile(micros, [50, 99])
+            rows.append(
+                {
+                    "phase": phase,
+                    "product": product,
+                    "calls": len(samples),
+                    "p50_us": round(float(p50), 1),
+                    "p99_us": round(float(p99), 1),
+                    "max_us": round(float(micros.max()), 1),
+                    "total_ms": round(float(micros.sum()) / 1e3, 2),
+                }
+            )
+        return sorted(rows, key=lambda row: -row["total_ms"])
+
+    def write(self, path: str) -> None:
+        """Write the summary as JSON if path ends in .json, otherwise as CSV."""
+        rows = self.summary()
+        with open(path, "w", newline="") as file:
+            if path.endswith(".json"):
+                json.dump(rows, file, indent=2)
+            else:
+                writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+
+    def print_summary(self) -> None:
+        print(
+            f"  {'phase':<26}{'product':<14}{'calls':>7}"
+            f"{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'total ms':>11}"
+        )
+        for row in self.summary():
+            print(
+                f"  {row['phase']:<26}{row['product']:<14}{row['calls']:>7}"
+                f"{row['p50_us']:>10.1f}{row['p99_us']:>10.1f}"
+                f"{row['max_us']:>10.1f}{row['total_ms']:>11.2f}"
+            )
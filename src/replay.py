@@ -0,0 +1,217 @@
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+import compact_datamodel
+import datamodel
+from backtester import load_trader
+from datamodel import Order, Symbol, TradingState
+from logreader import SandboxRecord, iter_log
+from orderbook import OrderBook
+
+
+class LoggedTick(NamedTuple):
+    state: TradingState
+    orders: Dict[Symbol, List[Order]]
+    conversions: int
+    trader_data: str
+    logs: str
+
+
+def parse_lambda_log(lambda_log: str) -> List[Any] | None:
+    """
+    The [state, orders, conversions, traderData, logs] array Logger.flush
+    printed, or None if the tick has none. Anything else the trader printed
+    comes before it, so only the last line is decoded.
+    """
+    lambda_log = lambda_log.strip()
+    if not lambda_log:
+        return None
+    line = lambda_log.rsplit("\n", 1)[-1]
+    if not line.startswith("[["):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def decode_trades(compressed: List[List[Any]], model=datamodel) -> Dict[Symbol, list]:
+    trades: Dict[Symbol, list] = {}
+    for symbol, price, quantity, buyer, seller, timestamp in compressed:
+        trades.setdefault(symbol, []).append(
+            model.Trade(symbol, price, quantity, buyer, seller, timestamp)
+        )
+    return trades
+
+
+def decode_state(compressed: List[Any], model=datamodel) -> TradingState:
+    """Invert Logger.compress_state. JSON turned the book prices into strings."""
+    (
+        timestamp,
+        trader_data,
+        listings,
+        order_depths,
+        own_trades,
+        market_trades,
+        position,
+        (plain_observations, conversion_observations),
+    ) = compressed
+
+    books = {}
+    for symbol, (buy_orders, sell_orders) in order_depths.items():
+        bids = sorted(
+            ((int(price), volume) for price, volume in buy_orders.items()),
+            reverse=True,
+        )
+        asks = sorted((int(price), volume) for price, volume in sell_orders.items())
+        books[symbol] = OrderBook.from_levels(
+            [price for price, _ in bids],
+            [volume for _, volume in bids],
+            [price for price, _ in asks],
+            [volume for _, volume in asks],
+        )
+
+    return TradingState(
+        trader_data,
+        timestamp,
+        {
+            symbol: {"symbol": symbol, "product": product, "denomination": currency}
+            for symbol, product, currency in listings
+        },
+        books,
+        decode_trades(own_trades, model),
+        decode_trades(market_trades, model),
+        position,
+        model.Observation(
+            plain_observations,
+            {
+                product: model.ConversionObservation(*values)
+                for product, values in conversion_observations.items()
+            },
+        ),
+    )
+
+
+def decode_orders(compressed: List[List[Any]], model=datamodel) -> Dict[Symbol, list]:
+    orders: Dict[Symbol, list] = {}
+    for symbol, price, quantity in compressed:
+        orders.setdefault(symbol, []).append(model.Order(symbol, price, quantity))
+    return orders
+
+
+def iter_ticks(path: str, compact: bool = False) -> Iterator[LoggedTick]:
+    """Stream the ticks of a log whose lambdaLog holds Logger.flush output."""
+    model = compact_datamodel if compact else datamodel
+    for record in iter_log(path):
+        if type(record) is not SandboxRecord:
+            continue
+        flushed = parse_lambda_log(record.lambda_log)
+        if flushed is None:
+            continue
+        state, orders, conversions, trader_data, logs = flushed
+        yield LoggedTick(
+            decode_state(state, model),
+            decode_orders(orders, model),
+            conversions,
+            trader_data,
+            logs,
+        )
+
+
+def order_key(orders: Dict[Symbol, List[Order]]) -> Dict[Symbol, List[Tuple]]:
+    return {
+        symbol: sorted((order.price, order.quantity) for order in symbol_orders)
+        for symbol, symbol_orders in orders.items()
+        if symbol_orders
+    }
+
+
+class TickDiff(NamedTuple):
+    timestamp: int
+    symbol: str
+    logged: Any
+    replayed: Any
+
+
+def replay(trader, path: str, compact: bool = False) -> Tuple[int, List[TickDiff]]:
+    """
+    Run a trader on every logged state and diff its orders and conversions
+    against the logged ones. The logged traderData is truncated by the
+    logger, so the trader is fed its own traderData from the previous tick.
+    """
+    ticks = 0
+    diffs: List[TickDiff] = []
+    trader_data = ""
+    for tick in iter_ticks(path, compact):
+        tick.state.traderData = trader_data
+        with contextlib.redirect_stdout(io.StringIO()):
+            orders, conversions, trader_data = trader.run(tick.state)
+
+        timestamp = tick.state.timestamp
+        logged = order_key(tick.orders)
+        replayed = order_key(orders)
+        for symbol in sorted(set(logged) | set(replayed)):
+            if logged.get(symbol) != replayed.get(symbol):
+                diffs.append(
+                    TickDiff(
+                        timestamp, symbol, logged.get(symbol), replayed.get(symbol)
+                    )
+                )
+        if conversions != tick.conversions:
+            diffs.append(
+                TickDiff(timestamp, "conversions", tick.conversions, conversions)
+            )
+        ticks += 1
+    return ticks, diffs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the TradingStates of a log from its Logger output "
+        "and replay a Trader against them"
+    )
+    parser.add_argument("log", help="submission or backtest log")
+    parser.add_argument(
+        "algorithm",
+        nargs="?",
+        help="Trader file to replay (default: only decode the log)",
+    )
+    parser.add_argument(
+        "--show", type=int, default=10, help="how many differences to print"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="use the slotted compact_datamodel classes for trades and observations",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.algorithm is None:
+        ticks = sum(1 for _ in iter_ticks(args.log, args.compact))
+        print(f"{ticks} states decoded in {time.perf_counter() - start:.2f}s")
+        return
+
+    ticks, diffs = replay(load_trader(args.algorithm), args.log, args.compact)
+    elapsed = time.perf_counter() - start
+    if ticks == 0:
+        print("No Logger output in this log's lambdaLog fields")
+        return
+
+    differing = len({diff.timestamp for diff in diffs})
+    print(
+        f"{ticks} ticks replayed in {elapsed:.2f}s, "
+        f"{differing} with different orders or conversions"
+    )
+    for diff in diffs[: args.show]:
+        print(f"  {diff.timestamp:>7} {diff.symbol:<14}")
+        print(f"    logged   {diff.logged}")
+        print(f"    replayed {diff.replayed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool
+from typing import Any, Dict, List, Tuple
+
+from backtester import DayData, load_trader, parse_days, run_backtest
+
+# worker_days is filled in the parent before the pool forks, so the workers
+# share its books copy-on-write instead of each rebuilding every day.
+worker_algorithm = ""
+worker_days: Dict[Tuple[int, int], DayData] = {}
+
+
+def init_worker(algorithm: str, days: List[Tuple[int, int]]) -> None:
+    global worker_algorithm
+    worker_algorithm = algorithm
+    # only a spawned (not forked) worker starts without the parent's days
+    for round_num, day in days:
+        if (round_num, day) not in worker_days:
+            worker_days[(round_num, day)] = DayData(round_num, day)
+
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict[str, Any]]:
+    names = list(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def run_configuration(job: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+    index, params = job
+    row: Dict[str, Any] = {"config": index}
+    # scalars as they are, csv quotes them; lists and objects as JSON
+    row.update(
+        {
+            name: value if isinstance(value, (str, int, float)) else json.dumps(value)
+            for name, value in params.items()
+        }
+    )
+
+    total_pnl = 0.0
+    volume = 0
+    max_inventory = 0
+    runtime = 0.0
+    for (round_num, day), data in worker_days.items():
+        # A fresh module per run, strategies keep state on the class as well
+        trader = load_trader(worker_algorithm)
+        for name, value in params.items():
+            setattr(trader, name, value)
+
+        result = run_backtest(trader, data)
+        pnl = result.total_pnl()
+        row[f"pnl_round_{round_num}_day_{day}"] = round(pnl, 1)
+
+        total_pnl += pnl
+        volume += sum(trade.quantity for trade in result.own_trades)
+        for positions in result.positions.values():
+            if positions:
+                max_inventory = max(max_inventory, max(positions), -min(positions))
+        runtime += result.runtime
+
+    row["pnl"] = round(total_pnl, 1)
+    row["volume"] = volume
+    row["max_inventory"] = max_inventory
+    row["runtime"] = round(runtime, 3)
+    return row
+
+
+def run_sweep(
+    algorithm: str,
+    days: List[Tuple[int, int]],
+    grid: Dict[str, list],
+    workers: int | None = None,
+) -> List[Dict[str, Any]]:
+    jobs = list(enumerate(expand_grid(grid)))
+    # converting cold or stale days and building the books happens once, here
+    for round_num, day in days:
+        worker_days[(round_num, day)] = DayData(round_num, day)
+    with Pool(
+        processes=workers or os.cpu_count(),
+        initializer=init_worker,
+        initargs=(algorithm, days),
+    ) as pool:
+        rows = list(pool.imap_unordered(run_configuration, jobs))
+    worker_days.clear()
+    return sorted(rows, key=lambda row: row["config"])
+
+
+def write_results(rows: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Backtest every configuration of a parameter grid in parallel"
+    )
+    parser.add_argument(
+        "algorithm", help="path to the file containing the Trader class"
+    )
+    parser.add_argument(
+        "days", nargs="+", help='days to run, e.g. "1", "1-0" or "1--2"'
+    )
+    parser.add_argument(
+        "--grid",
+        required=True,
+        help="JSON object or file mapping Trader attributes to lists of values",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="processes to use (default: all cores)"
+    )
+    parser.add_argument("--out", default="sweep_results.csv", help="results table path")
+    args = parser.parse_args()
+
+    if os.path.exists(args.grid):
+        with open(args.grid, "r") as file:
+            grid = json.load(file)
+    else:
+        grid = json.loads(args.grid)
+
+    start = time.perf_counter()
+    rows = run_sweep(
+        os.path.abspath(args.algorithm), parse_days(args.days), grid, args.workers
+    )
+    write_results(rows, args.out)
+
+    print(
+        f"{len(rows)} configurations in {time.perf_counter() - start:.1f}s, "
+        f"results written to {args.out}"
+    )
+    for row in sorted(rows, key=lambda row: row["pnl"], reverse=True)[:5]:
+        params = {name: row[name] for name in grid}
+        print(f"  {row['pnl']:>12,.0f}  {params}")
+
+
+if __name__ == "__main__":
+    main()
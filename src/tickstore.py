@@ -0,0 +1,303 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SRC_DIR, "..", "misc")
+STORE_DIR = os.path.join(DATA_DIR, ".tickstore")
+
+LEVELS = 3
+
+# Missing book levels are NaN prices with a zero volume, np.isnan(price) is the mask.
+PRICE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i4"),
+        ("product", "<u1"),
+        ("bid_price", "<f8", (LEVELS,)),
+        ("bid_volume", "<i4", (LEVELS,)),
+        ("ask_price", "<f8", (LEVELS,)),
+        ("ask_volume", "<i4", (LEVELS,)),
+        ("mid_price", "<f8"),
+        ("profit_and_loss", "<f8"),
+    ]
+)
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i4"),
+        ("product", "<u1"),
+        ("price", "<f8"),
+        ("quantity", "<i4"),
+    ]
+)
+
+# Round 2 ships the ORCHIDS conversion observations instead of order books.
+OBSERVATION_COLUMNS = [
+    "ORCHIDS",
+    "TRANSPORT_FEES",
+    "EXPORT_TARIFF",
+    "IMPORT_TARIFF",
+    "SUNLIGHT",
+    "HUMIDITY",
+]
+OBSERVATION_DTYPE = np.dtype(
+    [("timestamp", "<i4")] + [(name.lower(), "<f8") for name in OBSERVATION_COLUMNS]
+)
+
+
+class TickDay:
+    """
+    A round/day loaded from the tick store. Arrays are read-only memory maps,
+    rows are grouped by product so per-product access is a zero-copy slice.
+    """
+
+    def __init__(
+        self,
+        round_num: int,
+        day: int,
+        products: List[str],
+        prices: np.ndarray,
+        trades: np.ndarray,
+        observations: np.ndarray,
+        price_index: Dict[str, Tuple[int, int]],
+        trade_index: Dict[str, Tuple[int, int]],
+    ) -> None:
+        self.round_num = round_num
+        self.day = day
+        self.products = products
+        self.prices = prices
+        self.trades = trades
+        self.observations = observations
+        self.price_index = price_index
+        self.trade_index = trade_index
+
+    def product_id(self, product: str) -> int:
+        return self.products.index(product)
+
+    def product_prices(self, product: str) -> np.ndarray:
+        start, stop = self.price_index.get(product, (0, 0))
+        return self.prices[start:stop]
+
+    def product_trades(self, product: str) -> np.ndarray:
+        start, stop = self.trade_index.get(product, (0, 0))
+        return self.trades[start:stop]
+
+
+def csv_path(kind: str, round_num: int, day: int) -> str | None:
+    suffix = "_nn" if kind == "trades" else ""
+    pattern = os.path.join(
+        DATA_DIR, "*", f"{kind}_round_{round_num}_day_{day}{suffix}.csv"
+    )
+    matches = sorted(glob.glob(pattern))
+    return matches[0] if matches else None
+
+
+def store_paths(round_num: int, day: int) -> Dict[str, str]:
+    stem = os.path.join(STORE_DIR, f"round_{round_num}_day_{day}")
+    return {
+        "prices": f"{stem}_prices.npy",
+        "trades": f"{stem}_trades.npy",
+        "observations": f"{stem}_observations.npy",
+        "index": f"{stem}_index.json",
+    }
+
+
+def available_days() -> List[Tuple[int, int]]:
+    days = []
+    for path in glob.glob(os.path.join(DATA_DIR, "*", "prices_round_*_day_*.csv")):
+        name = os.path.basename(path)[: -len(".csv")]
+        round_str, day_str = name[len("prices_round_") :].split("_day_")
+        days.append((int(round_str), int(day_str)))
+    return sorted(days)
+
+
+def parse_float(value: str) -> float:
+    return float(value) if value else np.nan
+
+
+def read_prices(path: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    with open(path, "r") as file:
+        reader = csv.reader(file, delimiter=";")
+        header = next(reader)
+        rows = list(reader)
+
+    if header[0] == "timestamp":
+        column = {name: i for i, name in enumerate(header)}
+        observations = np.empty(len(rows), dtype=OBSERVATION_DTYPE)
+        observations["timestamp"] = [int(row[column["timestamp"]]) for row in rows]
+        for name in OBSERVATION_COLUMNS:
+            observations[name.lower()] = [
+                parse_float(row[column[name]]) for row in rows
+            ]
+        return [], np.empty(0, dtype=PRICE_DTYPE), observations
+
+    products = sorted({row[2] for row in rows})
+    ids = {product: i for i, product in enumerate(products)}
+    rows.sort(key=lambda row: (ids[row[2]], int(row[1])))
+
+    prices = np.empty(len(rows), dtype=PRICE_DTYPE)
+    prices["timestamp"] = [int(row[1]) for row in rows]
+    prices["product"] = [ids[row[2]] for row in rows]
+    for level in range(LEVELS):
+        bid = 3 + 2 * level
+        ask = 9 + 2 * level
+        prices["bid_price"][:, level] = [parse_float(row[bid]) for row in rows]
+        prices["bid_volume"][:, level] = [int(row[bid + 1] or 0) for row in rows]
+        prices["ask_price"][:, level] = [parse_float(row[ask]) for row in rows]
+        prices["ask_volume"][:, level] = [int(row[ask + 1] or 0) for row in rows]
+    prices["mid_price"] = [parse_float(row[15]) for row in rows]
+    prices["profit_and_loss"] = [parse_float(row[16]) for row in rows]
+
+    return products, prices, np.empty(0, dtype=OBSERVATION_DTYPE)
+
+
+def read_trades(path: str | None, products: List[str]) -> np.ndarray:
+    if path is None:
+        return np.empty(0, dtype=TRADE_DTYPE)
+
+    with open(path, "r") as file:
+        reader = csv.reader(file, delimiter=";")
+        next(reader)
+        rows = list(reader)
+
+    # Trades can reference products that never show up in the book.
+    for row in rows:
+        if row[3] not in products:
+            products.append(row[3])
+    ids = {product: i for i, product in enumerate(products)}
+    rows.sort(key=lambda row: (ids[row[3]], int(row[0])))
+
+    trades = np.empty(len(rows), dtype=TRADE_DTYPE)
+    trades["timestamp"] = [int(row[0]) for row in rows]
+    trades["product"] = [ids[row[3]] for row in rows]
+    trades["price"] = [float(row[5]) for row in rows]
+    trades["quantity"] = [int(row[6]) for row in rows]
+    return trades
+
+
+def row_index(array: np.ndarray, products: List[str]) -> Dict[str, Tuple[int, int]]:
+    if len(array) == 0:
+        return {}
+    ids = np.arange(len(products))
+    starts = np.searchsorted(array["product"], ids, side="left")
+    stops = np.searchsorted(array["product"], ids, side="right")
+    return {
+        product: (int(start), int(stop))
+        for product, start, stop in zip(products, starts, stops)
+        if stop > start
+    }
+
+
+def replace_file(path: str, write) -> None:
+    """Write through a temporary file so readers never see a partial one."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        write(file)
+    os.replace(temporary, path)
+
+
+def convert_day(round_num: int, day: int) -> Dict[str, str]:
+    """Parse one day of CSVs and write it to the tick store."""
+    prices_csv = csv_path("prices", round_num, day)
+    if prices_csv is None:
+        raise FileNotFoundError(f"No price data for round {round_num} day {day}")
+    trades_csv = csv_path("trades", round_num, day)
+
+    products, prices, observations = read_prices(prices_csv)
+    trades = read_trades(trades_csv, products)
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    paths = store_paths(round_num, day)
+    for kind, array in (
+        ("prices", prices),
+        ("trades", trades),
+        ("observations", observations),
+    ):
+        replace_file(paths[kind], lambda file: np.save(file, array))
+
+    index = {
+        "round": round_num,
+        "day": day,
+        "products": products,
+        "prices": row_index(prices, products),
+        "trades": row_index(trades, products),
+    }
+    # the index goes last, is_stale goes by its mtime
+    replace_file(paths["index"], lambda file: file.write(json.dumps(index).encode()))
+
+    return paths
+
+
+def is_stale(round_num: int, day: int) -> bool:
+    index_path = store_paths(round_num, day)["index"]
+    if not os.path.exists(index_path):
+        return True
+
+    built = os.path.getmtime(index_path)
+    for kind in ("prices", "trades"):
+        path = csv_path(kind, round_num, day)
+        if path is not None and os.path.getmtime(path) > built:
+            return True
+    return False
+
+
+def load_day(round_num: int, day: int, convert: bool = True) -> TickDay:
+    """
+    Memory-map one day from the tick store, converting it from the CSVs first
+    if it is missing or older than its sources.
+    """
+    if convert and is_stale(round_num, day):
+        convert_day(round_num, day)
+
+    paths = store_paths(round_num, day)
+    with open(paths["index"], "r") as file:
+        index = json.load(file)
+
+    return TickDay(
+        round_num,
+        day,
+        index["products"],
+        np.load(paths["prices"], mmap_mode="r"),
+        np.load(paths["trades"], mmap_mode="r"),
+        np.load(paths["observations"], mmap_mode="r"),
+        {product: tuple(rows) for product, rows in index["prices"].items()},
+        {product: tuple(rows) for product, rows in index["trades"].items()},
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert the data bottle CSVs into the binary tick store"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild days that are up to date"
+    )
+    args = parser.parse_args()
+
+    for round_num, day in available_days():
+        if args.force or is_stale(round_num, day):
+            start = time.perf_counter()
+            convert_day(round_num, day)
+            print(
+                f"Converted round {round_num} day {day} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+        start = time.perf_counter()
+        tick_day = load_day(round_num, day, convert=False)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Round {round_num} day {day}: {len(tick_day.prices)} book rows, "
+            f"{len(tick_day.trades)} trades, {len(tick_day.observations)} "
+            f"observations, loads in {elapsed:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
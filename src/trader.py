@@ -1,11 +1,11 @@
 import collections
 import json
 import math
+import operator
 import string
+from abc import ABC, abstractmethod
 from typing import Any, List
 
-import jsonpickle
-
 from datamodel import (
     Listing,
     Observation,
@@ -34,33 +34,33 @@ class Logger:
         conversions: int,
         trader_data: str,
     ) -> None:
-        base_length = len(
-            self.to_json(
-                [
-                    self.compress_state(state, ""),
-                    self.compress_orders(orders),
-                    conversions,
-                    "",
-                    "",
-                ]
-            )
+        # Encode everything once with empty strings in the three variable slots,
+        # then splice the truncated strings into those slots.
+        base = self.to_json(
+            [
+                self.compress_state(state, ""),
+                self.compress_orders(orders),
+                conversions,
+                "",
+                "",
+            ]
         )
 
         # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
-        max_item_length = (self.max_log_length - base_length) // 3
+        max_item_length = (self.max_log_length - len(base)) // 3
 
+        # base is '[[<timestamp>,""' + rest of the state ... + ',"",""]'
+        head = len(str(state.timestamp)) + 3
+        tail = len(',"",""]')
         print(
-            self.to_json(
-                [
-                    self.compress_state(
-                        state, self.truncate(state.traderData, max_item_length)
-                    ),
-                    self.compress_orders(orders),
-                    conversions,
-                    self.truncate(trader_data, max_item_length),
-                    self.truncate(self.logs, max_item_length),
-                ]
-            )
+            base[:head]
+            + self.to_json(self.truncate(state.traderData, max_item_length))
+            + base[head + 2 : -tail]
+            + ","
+            + self.to_json(self.truncate(trader_data, max_item_length))
+            + ","
+            + self.to_json(self.truncate(self.logs, max_item_length))
+            + "]"
         )
 
         self.logs = ""
@@ -147,26 +147,249 @@ class Logger:
 
 logger = Logger()
 
+
+class TraderDataCodec:
+    """
+    Schema-driven traderData encoding: "<version>:<json array of the fields in
+    schema order>". Field names never hit the wire and decoding is a single
+    json.loads, so the string stays short and cheap. decode returns None for
+    anything written under another version or not by this codec at all.
+    """
+
+    def __init__(self, version: str, fields: list[str]) -> None:
+        self.prefix = version + ":"
+        self.fields = fields
+
+    def encode(self, data: dict[str, Any]) -> str:
+        values = [data[name] for name in self.fields]
+        return self.prefix + json.dumps(values, separators=(",", ":"))
+
+    def decode(self, encoded: str) -> dict[str, Any] | None:
+        if not encoded.startswith(self.prefix):
+            return None
+        try:
+            values = json.loads(encoded[len(self.prefix) :])
+        except ValueError:
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            return None
+        return dict(zip(self.fields, values))
+
+
+class RecursiveLeastSquaresAR:
+    """
+    AR(p) price model with an intercept whose coefficients are updated by
+    recursive least squares on every new price, O(p^2) per tick. The last p
+    prices live in a fixed-size ring buffer; the regressors are
+    [1, oldest, ..., newest], the same layout as STARFRUIT_COEFFICIENTS.
+    """
+
+    def __init__(
+        self,
+        coefficients: list[float],
+        forgetting: float = 0.9999,
+        uncertainty: float = 0.01,
+    ) -> None:
+        self.lags = len(coefficients) - 1
+        self.forgetting = forgetting
+        self.coefficients = list(coefficients)
+        size = self.lags + 1
+        # inverse regressor covariance, a small prior keeps early updates gentle
+        self.covariance = [
+            [uncertainty if i == j else 0.0 for j in range(size)] for i in range(size)
+        ]
+        self.prices = [0.0] * self.lags
+        self.head = 0
+        self.count = 0
+
+    def regressors(self) -> list[float]:
+        return [1.0] + self.prices[self.head :] + self.prices[: self.head]
+
+    def predict(self) -> float | None:
+        if self.count < self.lags:
+            return None
+        return sum(c * x for c, x in zip(self.coefficients, self.regressors()))
+
+    def update(self, price: float) -> None:
+        if self.count >= self.lags:
+            x = self.regressors()
+            size = len(x)
+            px = [sum(row[j] * x[j] for j in range(size)) for row in self.covariance]
+            gain_denominator = self.forgetting + sum(x[i] * px[i] for i in range(size))
+            gain = [value / gain_denominator for value in px]
+            error = price - sum(c * v for c, v in zip(self.coefficients, x))
+            for i in range(size):
+                self.coefficients[i] += gain[i] * error
+            # update the upper triangle and mirror it, keeping P exactly symmetric
+            for i in range(size):
+                for j in range(i, size):
+                    value = (self.covariance[i][j] - gain[i] * px[j]) / self.forgetting
+                    self.covariance[i][j] = self.covariance[j][i] = value
+
+        self.prices[self.head] = price
+        self.head = (self.head + 1) % self.lags
+        self.count += 1
+
+    def to_state(self) -> list:
+        """
+        [coefficients, lower Cholesky factor of the covariance], both rounded.
+        The covariance itself is too ill-conditioned to round, a rounded
+        factor L still gives a positive definite L L^T. The price window is
+        not included, load_state takes it from the caller.
+        """
+        lower: list[list[float]] = []
+        for i, covariance_row in enumerate(self.covariance):
+            row: list[float] = []
+            for j in range(i):
+                # map stops at the j entries of row filled so far
+                value = covariance_row[j] - sum(map(operator.mul, row, lower[j]))
+                row.append(value / lower[j][j] if lower[j][j] else 0.0)
+            value = covariance_row[i] - sum(map(operator.mul, row, row))
+            row.append(math.sqrt(value) if value > 0 else 0.0)
+            lower.append(row)
+        return [
+            [float(f"{value:.10g}") for value in self.coefficients],
+            [float(f"{value:.6g}") for row in lower for value in row],
+        ]
+
+    def load_state(self, state: list, prices: list[float]) -> None:
+        """Restore to_state output, prices being at least the last `lags` prices."""
+        coefficients, packed = state
+        values = iter(packed)
+        lower = [[next(values) for _ in range(i + 1)] for i in range(self.lags + 1)]
+        for i, row in enumerate(lower):
+            for j in range(i + 1):
+                value = sum(map(operator.mul, row, lower[j]))
+                self.covariance[i][j] = self.covariance[j][i] = value
+        self.coefficients = coefficients
+        window = prices[-self.lags :]
+        self.prices = window + [0.0] * (self.lags - len(window))
+        self.head = len(window) % self.lags
+        self.count = len(window)
+
+
 POSITION_LIMITS = {"AMETHYSTS": 20, "STARFRUIT": 20, "ORCHIDS": 100}
-STARFRUIT_COEFFICIENTS = [5.24986188, 0.70354115, 0.23410216, 0.04909509, 0.01222407]
+# [intercept, oldest lag, ..., newest lag], the layout fit_ar.py prints
+STARFRUIT_COEFFICIENTS = [5.24986188, 0.01222407, 0.04909509, 0.23410216, 0.70354115]
+
+
+class Strategy(ABC):
+    """
+    One product's trading logic, run only on ticks where its product is in
+    order_depths. Its memory is its own slice of traderData: run() gets the
+    slice stored on the previous tick (None at first) and returns the next.
+    """
+
+    def __init__(self, trader: "Trader", product: str) -> None:
+        self.trader = trader
+        self.product = product
+
+    @abstractmethod
+    def run(self, state: TradingState, data: Any) -> tuple[List[Order], int, Any]:
+        pass
+
+
+class FixedFairValueStrategy(Strategy):
+    FAIR_VALUE = 10000
+
+    def run(self, state: TradingState, data: Any) -> tuple[List[Order], int, Any]:
+        orders = self.trader.generate_orders(state, self.product, self.FAIR_VALUE)
+        return orders, 0, None
+
+
+class StarfruitStrategy(Strategy):
+    # slice: [recent VWAP mids, RecursiveLeastSquaresAR state or None when frozen]
+
+    def run(self, state: TradingState, data: Any) -> tuple[List[Order], int, Any]:
+        trader = self.trader
+        previous_prices, model_state = data or ([], None)
+        model = None
+        if trader.STARFRUIT_PREDICTOR == "rls":
+            model = RecursiveLeastSquaresAR(STARFRUIT_COEFFICIENTS)
+            if model_state is not None:
+                model.load_state(model_state, previous_prices)
+
+        # both predictors need their lags, shorter memories are clamped up to them
+        memory = max(trader.PRICE_MEMORY, len(STARFRUIT_COEFFICIENTS) - 1)
+        price, previous_prices = trader.update_price_history(
+            previous_prices, state, self.product, memory
+        )
+        if model is None:
+            acceptable_price = self.frozen_price(previous_prices)
+            model_state = None
+        else:
+            if price is not None:
+                model.update(price)
+            expected_price = model.predict()
+            acceptable_price = int(expected_price) if expected_price is not None else 0
+            model_state = model.to_state()
+
+        orders = trader.generate_orders(state, self.product, acceptable_price)
+        return orders, 0, [previous_prices, model_state]
+
+    def frozen_price(self, previous_prices: list[float]) -> int:
+        lags = len(STARFRUIT_COEFFICIENTS) - 1
+        if len(previous_prices) >= lags:
+            window = previous_prices[-lags:]
+            expected_price = STARFRUIT_COEFFICIENTS[0] + sum(
+                STARFRUIT_COEFFICIENTS[i + 1] * window[i] for i in range(lags)
+            )
+            return int(expected_price)
+        return 0  # Not enough data to calculate price
+
+
+class OrchidStrategy(Strategy):
+    # slice: recent VWAP mids
+
+    def run(self, state: TradingState, data: Any) -> tuple[List[Order], int, Any]:
+        trader = self.trader
+        _, previous_prices = trader.update_price_history(
+            data or [], state, self.product, trader.PRICE_MEMORY
+        )
+        acceptable_price = int(previous_prices[-1]) if previous_prices else 0
+        orders, conversions = trader.generate_orchid_orders(state, acceptable_price)
+        return orders, conversions, previous_prices
+
+
+# product -> strategy, products without one are never looked at
+STRATEGIES = {
+    "AMETHYSTS": FixedFairValueStrategy,
+    "STARFRUIT": StarfruitStrategy,
+    "ORCHIDS": OrchidStrategy,
+}
+
+# one traderData slot per registered product
+TRADER_DATA_CODEC = TraderDataCodec("3", list(STRATEGIES))
 
 
 class Trader:
+    # Quoting knobs, overridden per configuration by sweep.py
+    PRICE_MEMORY = 4
+    HALF_LIMIT_DIVISOR = 2
+    # (s1, s2) offsets from the fair price and the best bid/ask per inventory tier
+    BUY_OFFSETS = {"short": (0, 0), "flat": (-2, 1), "long": (-1, 1)}
+    SELL_OFFSETS = {"long": (0, 0), "flat": (2, -1), "short": (2, -2)}
+    # "frozen" uses the offline AR fit, "rls" re-fits it online. On the round 1
+    # days both predict the next mid with the same RMSE (~0.57), but rls
+    # carries its model through traderData, ~100-125us a tick to decode, load,
+    # update and re-encode against ~1.5us for frozen (benchmarks.py rls), so
+    # frozen is the default.
+    STARFRUIT_PREDICTOR = "frozen"
+    # products whose strategy is skipped, their traderData slice is kept
+    DISABLED_PRODUCTS: list[str] = []
+
     def __init__(self):
-        self.previous_starfruit_prices = []
-        self.previous_orchids_prices = []
+        self.strategies = {
+            product: strategy(self, product) for product, strategy in STRATEGIES.items()
+        }
 
     def deserialize_trader_data(self, state_data):
-        try:
-            return jsonpickle.decode(state_data)
-        except:
+        if not state_data:
             return {}
+        return TRADER_DATA_CODEC.decode(state_data) or {}
 
     def serialize_trader_data(self, data):
-        try:
-            return jsonpickle.encode(data)
-        except:
-            return None
+        return TRADER_DATA_CODEC.encode(data)
 
     def vwap(self, orders: dict) -> float:
         total_volume = sum(orders.values())
@@ -181,14 +404,12 @@ class Trader:
 
     def update_price_history(
         self,
-        previous_trading_state,
+        previous_prices: list[float],
         state: TradingState,
         product: str,
         memory: int = 4,
-    ):
-        previous_prices_key = f"previous_{product.lower()}_prices"
-        previous_prices = previous_trading_state.get(previous_prices_key, [])
-
+    ) -> tuple[float | None, list[float]]:
+        """The tick's VWAP mid (None without a two-sided book) and the new history."""
         orders = state.order_depths.get(product, OrderDepth())
         sell_orders = orders.sell_orders
         buy_orders = orders.buy_orders
@@ -197,31 +418,12 @@ class Trader:
             sell_vwap = self.vwap(sell_orders)
             buy_vwap = self.vwap(buy_orders)
             current_vwap = (sell_vwap + buy_vwap) / 2
-            previous_prices.append(current_vwap)
+            previous_prices = previous_prices + [current_vwap]
             previous_prices = previous_prices[-memory:]  # Only cache last 4 ticks
+        else:
+            current_vwap = None
 
-        # Update the state with the new price history
-        setattr(self, previous_prices_key, previous_prices)
-
-    def calculate_acceptable_price(self, product) -> int:
-        if product == "AMETHYSTS":
-            return 10000
-
-        if product == "STARFRUIT":
-            if len(self.previous_starfruit_prices) >= len(STARFRUIT_COEFFICIENTS) - 1:
-                expected_price = STARFRUIT_COEFFICIENTS[0] + sum(
-                    STARFRUIT_COEFFICIENTS[i + 1] * self.previous_starfruit_prices[i]
-                    for i in range(len(STARFRUIT_COEFFICIENTS) - 1)
-                )
-                return int(expected_price)
-            else:
-                return 0  # Not enough data to calculate price
-
-        if product == "ORCHIDS":
-            if len(self.previous_orchids_prices) >= 1:
-                return int(self.previous_orchids_prices[-1])
-
-        return 0
+        return current_vwap, previous_prices
 
     # def orchid_trading_decision(self, state: TradingState) -> float:
     #     if not self.previous_orchids_prices:
@@ -276,7 +478,7 @@ class Trader:
         position_limit = POSITION_LIMITS.get(product, 20)
         buy_pos = position
 
-        HALF_LIMIT = POSITION_LIMITS.get(product) // 2
+        HALF_LIMIT = POSITION_LIMITS.get(product) // self.HALF_LIMIT_DIVISOR
 
         # BUYING
         for ask, volume in sorted_sell_orders:
@@ -297,14 +499,14 @@ class Trader:
 
         if buy_pos < position_limit:  # maximize market exposure
             if buy_pos < 0:
-                s1, s2 = 0, 0
+                s1, s2 = self.BUY_OFFSETS["short"]
                 # try to get back to neutral at a good price
                 target = min(mid_price_floor + s1, best_bid + s2)
                 neutralzing_quantity = abs(buy_pos)
                 buy_pos += neutralzing_quantity
                 orders.append(Order(product, target, neutralzing_quantity))  # limit buy
             if 0 <= buy_pos and buy_pos <= HALF_LIMIT:
-                s1, s2 = -2, 1
+                s1, s2 = self.BUY_OFFSETS["flat"]
                 target = min(mid_price_floor + s1, best_bid + s2)
                 neutralzing_quantity = (
                     -buy_pos + HALF_LIMIT
@@ -312,7 +514,7 @@ class Trader:
                 buy_pos += neutralzing_quantity
                 orders.append(Order(product, target, neutralzing_quantity))  # limit buy
             if buy_pos >= HALF_LIMIT:
-                s1, s2 = -1, 1
+                s1, s2 = self.BUY_OFFSETS["long"]
                 target = min(mid_price_floor + s1, best_bid + s2)
                 neutralzing_quantity = position_limit - buy_pos
                 buy_pos += neutralzing_quantity
@@ -335,19 +537,19 @@ class Trader:
 
         if sell_pos > -position_limit:  # room to sell more
             if sell_pos > 0:  # we are long
-                s1, s2 = 0, 0
+                s1, s2 = self.SELL_OFFSETS["long"]
                 target = max(mid_price_ceil + s1, best_ask + s2)
                 neutralzing_quantity = -sell_pos
                 sell_pos += neutralzing_quantity
                 orders.append(Order(product, target, neutralzing_quantity))
             if sell_pos <= 0 and sell_pos >= -HALF_LIMIT:  # SAFE
-                s1, s2 = 2, -1
+                s1, s2 = self.SELL_OFFSETS["flat"]
                 target = max(mid_price_ceil + s1, best_ask + s2)
                 neutralzing_quantity = -sell_pos - HALF_LIMIT
                 sell_pos += neutralzing_quantity
                 orders.append(Order(product, target, neutralzing_quantity))
             if sell_pos <= -HALF_LIMIT:
-                s1, s2 = 2, -2
+                s1, s2 = self.SELL_OFFSETS["short"]
                 target = max(mid_price_ceil + s1, best_ask + s2)
                 neutralzing_quantity = -position_limit - sell_pos
                 sell_pos += neutralzing_quantity
@@ -429,41 +631,26 @@ class Trader:
         conversion_requests = -state.position.get("ORCHIDS", 0)
         return orders, conversion_requests
 
+    def run_strategy(self, product: str, state: TradingState, data: Any) -> tuple:
+        return self.strategies[product].run(state, data)
+
     def run(self, state: TradingState):
         previous_state_data = self.deserialize_trader_data(state.traderData)
-        self.update_price_history(
-            previous_state_data,
-            state,
-            "STARFRUIT",
-            memory=4,
-        )
-        self.update_price_history(previous_state_data, state, "ORCHIDS", 4)
+        trader_data = {
+            product: previous_state_data.get(product) for product in self.strategies
+        }
 
         result = {}
-        conversion_requests = 0
-
-        for product, order_depth in state.order_depths.items():
-            acceptable_price = self.calculate_acceptable_price(product)
-            if product in ["AMETHYSTS", "STARFRUIT"]:
-                orders = self.generate_orders(
-                    state,
-                    product,
-                    acceptable_price,
-                )
-                result[product] = orders
-            elif product == "ORCHIDS":
-                # orchid_signal = self.orchid_trading_decision(state)
-
-                orders, conversion_requests = self.generate_orchid_orders(
-                    state, acceptable_price
-                )
-                result[product] = orders
+        conversions = 0
 
-        trader_data = {
-            "previous_starfruit_prices": self.previous_starfruit_prices,
-            "previous_orchids_prices": self.previous_orchids_prices,
-        }
-        conversions = conversion_requests
+        for product in state.order_depths:
+            if product not in self.strategies or product in self.DISABLED_PRODUCTS:
+                continue
+            orders, product_conversions, trader_data[product] = self.run_strategy(
+                product, state, trader_data[product]
+            )
+            result[product] = orders
+            conversions += product_conversions
 
         serialized_trader_data = self.serialize_trader_data(trader_data)
 
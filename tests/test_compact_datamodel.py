@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import compact_datamodel
+import datamodel
+from datamodel import ProsperityEncoder, TradingState
+
+OBSERVATION = (1096.5, 1098.0, 1.1, 9.5, -5.0, 2500.0, 80.0)
+
+
+def build_state(model) -> TradingState:
+    order_depth = model.OrderDepth()
+    order_depth.buy_orders = {9998: 5, 9996: 20}
+    order_depth.sell_orders = {10002: -4, 10004: -20}
+    trade = model.Trade("AMETHYSTS", 10002, 3, "SUBMISSION", "", 100)
+    return TradingState(
+        "[1, 2]",
+        200,
+        {"AMETHYSTS": model.Listing("AMETHYSTS", "AMETHYSTS", "SEASHELLS")},
+        {"AMETHYSTS": order_depth},
+        {"AMETHYSTS": [trade]},
+        {"AMETHYSTS": []},
+        {"AMETHYSTS": 3},
+        model.Observation(
+            {"SUNLIGHT": 2500.0},
+            {"ORCHIDS": model.ConversionObservation(*OBSERVATION)},
+        ),
+    )
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+# jsonpickle warns about its upcoming keys=True default on every encode
+def test_observation_str_matches_datamodel():
+    expected = build_state(datamodel).observations
+    actual = build_state(compact_datamodel).observations
+    assert str(actual) == str(expected)
+
+
+@pytest.mark.parametrize(
+    "name, args",
+    [
+        ("Order", ("STARFRUIT", 5040, -2)),
+        ("Trade", ("STARFRUIT", 5040, 2, "SUBMISSION", "", 100)),
+    ],
+)
+def test_str_and_repr_match_datamodel(name, args):
+    expected = getattr(datamodel, name)(*args)
+    actual = getattr(compact_datamodel, name)(*args)
+    assert str(actual) == str(expected)
+    assert repr(actual) == repr(expected)
+
+
+def test_to_json_matches_datamodel():
+    expected = build_state(datamodel).toJSON()
+    assert build_state(compact_datamodel).toJSON() == expected
+
+
+def test_prosperity_encoder_matches_datamodel():
+    expected = build_state(datamodel)
+    actual = build_state(compact_datamodel)
+    for name in ("listings", "order_depths", "own_trades", "observations"):
+        assert json.dumps(
+            getattr(actual, name), cls=ProsperityEncoder, sort_keys=True
+        ) == json.dumps(getattr(expected, name), cls=ProsperityEncoder, sort_keys=True)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from compile_tree import check_parity
+from feature_store import DAYS, load_days
+
+FEATURES = ["ORCHIDS_lag_1", "SUNLIGHT", "HUMIDITY", "EXPORT_TARIFF"]
+
+
+@pytest.mark.parametrize(
+    "model", [DecisionTreeClassifier(max_depth=6), DecisionTreeRegressor(max_depth=8)]
+)
+def test_parity_on_random_data(model):
+    rng = np.random.default_rng(0)
+    X = np.round(rng.normal(size=(2000, 3)), 2)
+    y = X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.1, size=len(X))
+    if isinstance(model, DecisionTreeClassifier):
+        y = (y > 0).astype(int)
+    model.set_params(random_state=0).fit(X, y)
+    assert check_parity(model, ["a", "b", "c"], X) == 0
+
+
+def test_parity_on_round_2_features():
+    data = load_days(DAYS, lags=1)
+    X = data[FEATURES].to_numpy()
+    rising = (data["NextDayOrchids"] > data["ORCHIDS"]).astype(int).to_numpy()
+    for model, y in (
+        (DecisionTreeClassifier(max_depth=4, random_state=0), rising),
+        (DecisionTreeRegressor(max_depth=6, random_state=0), data["PriceChange"]),
+    ):
+        model.fit(X, y)
+        assert check_parity(model, FEATURES, X) == 0, type(model).__name__
@@ -0,0 +1,82 @@
+import pytest
+
+from backtester import DayData, run_backtest
+from conversions import ConversionSettler
+from datamodel import Order
+
+# bid, ask, transport, export tariff, import tariff, sunlight, humidity
+OBSERVATIONS = {"ORCHIDS": (1100.0, 1102.0, 1.5, 9.0, -3.0, 2500.0, 80.0)}
+
+
+def test_import_price_is_ask_plus_transport_and_import_tariff():
+    settler = ConversionSettler()
+    position = {"ORCHIDS": -10}
+    assert settler.convert(4, position, OBSERVATIONS) == 4
+    assert position == {"ORCHIDS": -6}
+    assert settler.cash["ORCHIDS"] == pytest.approx(-4 * (1102.0 + 1.5 - 3.0))
+    assert settler.fees["ORCHIDS"] == pytest.approx(4 * (1.5 - 3.0))
+    assert settler.converted["ORCHIDS"] == 4
+
+
+def test_export_price_is_bid_minus_transport_and_export_tariff():
+    settler = ConversionSettler()
+    position = {"ORCHIDS": 10}
+    assert settler.convert(-10, position, OBSERVATIONS) == -10
+    assert position == {"ORCHIDS": 0}
+    assert settler.cash["ORCHIDS"] == pytest.approx(10 * (1100.0 - 1.5 - 9.0))
+    assert settler.fees["ORCHIDS"] == pytest.approx(10 * (1.5 + 9.0))
+
+
+def test_storage_is_charged_on_net_long_only():
+    settler = ConversionSettler()
+    settler.charge_storage({"ORCHIDS": 30})
+    assert settler.cash["ORCHIDS"] == pytest.approx(-3.0)
+    assert settler.storage["ORCHIDS"] == pytest.approx(3.0)
+
+    settler.charge_storage({"ORCHIDS": -30})
+    settler.charge_storage({})
+    assert settler.storage["ORCHIDS"] == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize(
+    "held, conversions",
+    [
+        (0, 1),  # nothing to convert
+        (-5, -1),  # selling deepens a short
+        (5, 1),  # buying deepens a long
+        (-5, 6),  # flips short to long
+        (5, -6),  # flips long to short
+    ],
+)
+def test_rejected_conversions_change_nothing(held, conversions):
+    settler = ConversionSettler()
+    position = {"ORCHIDS": held}
+    assert settler.convert(conversions, position, OBSERVATIONS) == 0
+    assert position == {"ORCHIDS": held}
+    assert settler.cash == settler.fees == settler.converted == {}
+
+
+def test_no_observations_converts_nothing():
+    settler = ConversionSettler()
+    position = {"ORCHIDS": -5}
+    assert settler.convert(5, position, {}) == 0
+    assert position == {"ORCHIDS": -5}
+    assert settler.cash == {}
+
+
+class BuyAndConvert:
+    """Lifts one AMETHYST a tick and asks to sell one unit south every tick."""
+
+    def run(self, state):
+        depth = state.order_depths["AMETHYSTS"]
+        orders = {"AMETHYSTS": [Order("AMETHYSTS", min(depth.sell_orders), 1)]}
+        return orders, -1, ""
+
+
+def test_day_without_observations_settles_no_conversions():
+    data = DayData(1, 0)
+    assert not data.observations
+    result = run_backtest(BuyAndConvert(), data)
+    assert any(result.conversions)
+    assert not any(result.converted)
+    assert result.conversion_fees == result.storage_costs == {}
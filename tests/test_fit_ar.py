@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import fit_ar
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(fit_ar, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(fit_ar, "design_cache", {})
+    return tmp_path
+
+
+def test_archive_keeps_days_written_by_earlier_runs(fresh_cache, monkeypatch):
+    # each call stands for a separate run, with nothing cached in memory
+    first = fit_ar.design_matrices("STARFRUIT", 4, "mid", [(1, -2)])
+    monkeypatch.setattr(fit_ar, "design_cache", {})
+    fit_ar.design_matrices("STARFRUIT", 4, "mid", [(1, -1)])
+
+    with np.load(fit_ar.cache_path("STARFRUIT", 4, "mid")) as archive:
+        assert sorted(archive.files) == ["X_1_-1", "X_1_-2", "y_1_-1", "y_1_-2"]
+
+    def load_day(round_num, day):
+        raise AssertionError(f"rebuilt {round_num} {day} instead of loading it")
+
+    monkeypatch.setattr(fit_ar, "design_cache", {})
+    monkeypatch.setattr(fit_ar, "load_day", load_day)
+    reloaded = fit_ar.design_matrices("STARFRUIT", 4, "mid", [(1, -2), (1, -1)])
+    np.testing.assert_array_equal(reloaded[(1, -2)][0], first[(1, -2)][0])
+    np.testing.assert_array_equal(reloaded[(1, -2)][1], first[(1, -2)][1])
@@ -0,0 +1,102 @@
+import pytest
+
+from datamodel import Order, OrderDepth, Trade
+from matching import SUBMISSION, PriceLadder, exceeds_limit, match_orders, match_product
+from orderbook import OrderBook
+
+
+def order_depth(kind, buy_orders, sell_orders):
+    if kind == "book":
+        return OrderBook(buy_orders, sell_orders)
+    depth = OrderDepth()
+    depth.buy_orders = dict(buy_orders)
+    depth.sell_orders = dict(sell_orders)
+    return depth
+
+
+@pytest.fixture(params=["dict", "book"])
+def kind(request):
+    return request.param
+
+
+def fills_of(fills):
+    return [(fill.price, fill.quantity, fill.buyer, fill.seller) for fill in fills]
+
+
+def test_exceeds_limit():
+    assert not exceeds_limit([Order("A", 10, 5), Order("A", 9, -25)], 15, 20)
+    assert exceeds_limit([Order("A", 10, 3), Order("A", 9, 3)], 15, 20)
+    assert exceeds_limit([Order("A", 10, -6)], -15, 20)
+
+
+def test_breaching_product_is_rejected_whole(kind):
+    depths = {
+        "A": order_depth(kind, {9: 5}, {10: -5}),
+        "B": order_depth(kind, {9: 5}, {10: -5}),
+    }
+    orders = {
+        "A": [Order("A", 10, 3), Order("A", 10, 3)],
+        "B": [Order("B", 10, 2)],
+    }
+    fills, position = match_orders(
+        0, depths, orders, {"A": 15}, limits={"A": 20, "B": 20}
+    )
+    assert position == {"A": 15, "B": 2}
+    assert [fill.symbol for fill in fills] == ["B"]
+
+
+def test_partial_fills_across_levels_with_price_time_priority(kind):
+    depth = order_depth(kind, {}, {10: -2, 11: -3, 12: -5})
+    orders = [
+        Order("A", 11, 3),  # same price as the next one, submitted first
+        Order("A", 11, 3),
+        Order("A", 12, 1),  # best price, filled before both
+    ]
+    fills, position = match_product(0, "A", depth, orders, 0, 20)
+    assert fills_of(fills) == [
+        (10, 1, SUBMISSION, ""),
+        (10, 1, SUBMISSION, ""),
+        (11, 2, SUBMISSION, ""),
+        (11, 1, SUBMISSION, ""),
+    ]
+    assert position == 5
+    # the book the orders were matched against is left as it was
+    assert depth.sell_orders == {10: -2, 11: -3, 12: -5}
+
+
+def test_sells_walk_the_bids(kind):
+    depth = order_depth(kind, {10: 2, 9: 4, 8: 5}, {})
+    fills, position = match_product(0, "A", depth, [Order("A", 9, -7)], 0, 20)
+    assert fills_of(fills) == [(10, 2, "", SUBMISSION), (9, 4, "", SUBMISSION)]
+    assert position == -6
+
+
+def test_market_trades_fill_after_the_book_at_our_price(kind):
+    depth = order_depth(kind, {}, {10: -1})
+    market_trades = [
+        Trade("A", 13, 4, "X", "Y", 0),  # above our price, never fills
+        Trade("A", 11, 5, "X", "Y", 0),
+    ]
+    fills, position = match_product(
+        0, "A", depth, [Order("A", 12, 3)], 0, 20, market_trades
+    )
+    assert fills_of(fills) == [(10, 1, SUBMISSION, ""), (12, 2, SUBMISSION, "Y")]
+    assert position == 3
+
+
+def test_market_trade_quantities_are_consumed_in_place(kind):
+    # run_backtest relies on this: what is left is next tick's market trades
+    depth = order_depth(kind, {}, {})
+    trade = Trade("A", 11, 5, "X", "Y", 0)
+    match_product(0, "A", depth, [Order("A", 12, 3)], 0, 20, [trade])
+    assert trade.quantity == 2
+    match_product(0, "A", depth, [Order("A", 12, 3)], 0, 20, [trade])
+    assert trade.quantity == 0
+
+
+def test_price_ladder_take():
+    ladder = PriceLadder([10, 11, 12], [2, 3, 5], descending=False)
+    assert ladder.take(11, 4) == [(10, 2), (11, 2)]
+    assert ladder.take(11, 4) == [(11, 1)]
+    assert ladder.take(12, 10) == [(12, 5)]
+    assert ladder.take(20, 1) == []
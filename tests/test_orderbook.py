@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from orderbook import OrderBook
+
+
+def assert_in_sync(book):
+    # the dicts, the level lists and the totals describe the same book
+    assert list(book.buy_orders.items()) == list(book.bids())
+    assert list(book.sell_orders.items()) == list(book.asks())
+    assert [-key for key in book.bid_keys] == sorted(book.buy_orders, reverse=True)
+    assert book.ask_prices == sorted(book.sell_orders)
+    assert book.bid_volume == sum(book.buy_orders.values())
+    assert book.ask_volume == sum(book.sell_orders.values())
+
+
+@pytest.fixture
+def book():
+    return OrderBook.from_levels([10, 9, 8], [1, 2, 3], [12, 13, 14], [4, 5, 6])
+
+
+def test_from_levels(book):
+    assert book.buy_orders == {10: 1, 9: 2, 8: 3}
+    assert book.sell_orders == {12: -4, 13: -5, 14: -6}
+    assert (book.best_bid, book.best_ask) == (10, 12)
+    assert (book.bid_volume, book.ask_volume) == (6, -15)
+    assert_in_sync(book)
+
+
+def test_from_levels_skips_missing_levels():
+    book = OrderBook.from_levels([10, math.nan], [1, 0], [math.nan], [0])
+    assert book.buy_orders == {10: 1}
+    assert book.sell_orders == {}
+    assert book.best_ask is None
+    assert_in_sync(book)
+
+
+def test_from_csv_row():
+    line = "-1;100;STARFRUIT;5040;2;5039;20;;;5046;22;5047;1;;;5043.0;0.0"
+    book = OrderBook.from_csv_row(line.split(";"))
+    assert book.buy_orders == {5040: 2, 5039: 20}
+    assert book.sell_orders == {5046: -22, 5047: -1}
+    assert_in_sync(book)
+
+
+def test_set_bid_insert_update_remove(book):
+    book.set_bid(11, 7)
+    assert book.best_bid == 11
+    book.set_bid(9, 5)
+    assert book.buy_orders == {11: 7, 10: 1, 9: 5, 8: 3}
+    book.set_bid(10, 0)
+    assert book.buy_orders == {11: 7, 9: 5, 8: 3}
+    book.set_bid(7, 0)  # removing a missing level changes nothing
+    assert book.bid_volume == 15
+    assert_in_sync(book)
+
+
+def test_set_ask_insert_update_remove(book):
+    book.set_ask(11, -7)
+    assert book.best_ask == 11
+    book.set_ask(13, -1)
+    assert book.sell_orders == {11: -7, 12: -4, 13: -1, 14: -6}
+    book.set_ask(11, 0)
+    book.set_ask(12, 0)
+    assert book.best_ask == 13
+    assert book.ask_volume == -7
+    assert_in_sync(book)
+
+
+def test_copy_is_independent(book):
+    copied = book.copy()
+    copied.set_bid(10, 0)
+    copied.set_ask(15, -1)
+    copied.buy_orders[1] = 1
+
+    assert book.buy_orders == {10: 1, 9: 2, 8: 3}
+    assert book.sell_orders == {12: -4, 13: -5, 14: -6}
+    assert (book.best_bid, book.bid_volume, book.ask_volume) == (10, 6, -15)
+    assert_in_sync(book)
+    assert copied.best_bid == 9
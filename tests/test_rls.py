@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import trader
+
+# [intercept, oldest lag, ..., newest lag], mean 100
+TRUE_COEFFICIENTS = [15.0, 0.05, 0.1, 0.2, 0.5]
+
+
+def ar_series(size, seed=0):
+    rng = np.random.default_rng(seed)
+    lags = len(TRUE_COEFFICIENTS) - 1
+    prices = [100.0] * lags
+    for _ in range(size):
+        prices.append(
+            TRUE_COEFFICIENTS[0]
+            + np.dot(TRUE_COEFFICIENTS[1:], prices[-lags:])
+            + rng.normal()
+        )
+    return prices
+
+
+def test_update_converges_to_least_squares_fit():
+    prices = ar_series(5000)
+    lags = len(TRUE_COEFFICIENTS) - 1
+    # no forgetting and a vague prior, so RLS solves the full-sample fit up to
+    # the prior's pull on the intercept
+    model = trader.RecursiveLeastSquaresAR([0.0] * (lags + 1), 1.0, 1e6)
+    for price in prices:
+        model.update(price)
+
+    design = np.array([[1.0] + prices[t - lags : t] for t in range(lags, len(prices))])
+    fitted, *_ = np.linalg.lstsq(design, np.array(prices[lags:]), rcond=None)
+    assert model.coefficients == pytest.approx(fitted, abs=1e-4)
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+# jsonpickle warns about its upcoming keys=True default on every encode
+def test_state_survives_trader_data_round_trips():
+    # the STARFRUIT strategy's loop: decode, load, update, encode every tick
+    prices = [price + 4900.0 for price in ar_series(2000, seed=1)]
+    strategy = trader.Trader()
+    live = trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS)
+    encoded = ""
+    window: list[float] = []
+    for price in prices:
+        live.update(price)
+
+        data = strategy.deserialize_trader_data(encoded)
+        model = trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS)
+        if data:
+            model.load_state(data["STARFRUIT"][1], window)
+        model.update(price)
+        window = (window + [price])[-model.lags :]
+        data = dict.fromkeys(trader.STRATEGIES)
+        data["STARFRUIT"] = [window, model.to_state()]
+        encoded = strategy.serialize_trader_data(data)
+
+        if live.count > live.lags:
+            assert model.predict() == pytest.approx(live.predict(), abs=0.02)
+    assert model.coefficients == pytest.approx(live.coefficients, abs=1e-3)
@@ -0,0 +1,59 @@
+import json
+import random
+
+import jsonpickle
+import numpy as np
+import pytest
+
+from staub import RecordedData, SlidingTrend
+
+
+def random_walk(length, seed=0):
+    rng = np.random.default_rng(seed)
+    return (5040 + np.cumsum(rng.integers(-2, 3, length)) / 2).tolist()
+
+
+@pytest.mark.parametrize("size", [2, 5, 38])
+def test_sliding_trend_matches_polyfit(size):
+    trend = SlidingTrend(size)
+    cache = []
+    for value in random_walk(size * 20):
+        trend.push(value)
+        cache = (cache + [value])[-size:]
+        if not trend.full():
+            continue
+        slope, intercept = np.polyfit(np.arange(size), cache, 1)
+        assert trend.estimate() == pytest.approx(slope * size + intercept, abs=1e-6)
+
+
+def test_sliding_trend_state_round_trip():
+    size = 38
+    trend = SlidingTrend(size)
+    restored = SlidingTrend(size)
+    for value in random_walk(size * 3):
+        trend.push(value)
+        restored = SlidingTrend(size, *json.loads(json.dumps(restored.to_state())))
+        restored.push(value)
+        assert restored.to_state() == trend.to_state()
+
+
+# jsonpickle warns about its upcoming keys=True default on every encode
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_recorded_data_round_trip():
+    data = RecordedData()
+    data.amethyst_hvwap.buy_volume = 12
+    data.amethyst_hvwap.sell_price_volume = 120030.5
+    for _ in range(50):
+        data.starfruit_trend.push(5040 + random.randint(0, 10) / 2)
+    data.POSITION = {"AMETHYSTS": -4, "STARFRUIT": 20, "ORCHIDS": 0}
+    data.AME_RANGE = 3
+
+    decoded = RecordedData.decode(data.encode())
+    assert jsonpickle.encode(decoded) == jsonpickle.encode(data)
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_recorded_data_rejects_other_payloads():
+    # the jsonpickle traderData staub.py wrote before its codec
+    assert RecordedData.decode(jsonpickle.encode(RecordedData())) is None
+    assert RecordedData.decode("") is None
@@ -0,0 +1,18 @@
+import pytest
+
+import trader
+
+
+def test_registered_strategies_instantiate():
+    strategies = trader.Trader().strategies
+    assert list(strategies) == list(trader.STRATEGIES)
+    for product, strategy in strategies.items():
+        assert strategy.product == product
+
+
+def test_strategy_without_run_fails_on_creation():
+    class Unfinished(trader.Strategy):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished(trader.Trader(), "STARFRUIT")
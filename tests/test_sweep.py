@@ -0,0 +1,19 @@
+import os
+
+from backtester import DayData, load_trader, run_backtest
+from sweep import run_sweep
+
+TRADER = os.path.join(os.path.dirname(__file__), "..", "src", "trader.py")
+
+
+def test_grid_matches_sequential_backtests():
+    grid = {"HALF_LIMIT_DIVISOR": [2, 4]}
+    rows = run_sweep(os.path.abspath(TRADER), [(1, 0)], grid, workers=2)
+
+    data = DayData(1, 0)
+    for row, divisor in zip(rows, grid["HALF_LIMIT_DIVISOR"]):
+        trader = load_trader(TRADER)
+        trader.HALF_LIMIT_DIVISOR = divisor
+        expected = round(run_backtest(trader, data).total_pnl(), 1)
+        assert row["HALF_LIMIT_DIVISOR"] == divisor
+        assert row["pnl_round_1_day_0"] == expected
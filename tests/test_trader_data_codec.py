@@ -0,0 +1,49 @@
+import jsonpickle
+import pytest
+
+import trader
+
+
+def sample_trader_data():
+    return {
+        "AMETHYSTS": None,
+        "STARFRUIT": [
+            [5045.5, 5046.333333333333, 5044.0, 5047.25],
+            trader.RecursiveLeastSquaresAR(trader.STARFRUIT_COEFFICIENTS).to_state(),
+        ],
+        "ORCHIDS": [1100.75],
+    }
+
+
+def test_round_trip():
+    strategy = trader.Trader()
+    trader_data = sample_trader_data()
+    encoded = strategy.serialize_trader_data(trader_data)
+    assert encoded.startswith(trader.TRADER_DATA_CODEC.prefix)
+    assert strategy.deserialize_trader_data(encoded) == trader_data
+
+
+def test_other_version_decodes_to_nothing():
+    encoded = trader.TRADER_DATA_CODEC.encode(sample_trader_data())
+    stale = "0:" + encoded[len(trader.TRADER_DATA_CODEC.prefix) :]
+    assert trader.TRADER_DATA_CODEC.decode(stale) is None
+    assert trader.Trader().deserialize_trader_data(stale) == {}
+
+
+@pytest.mark.parametrize("state_data", ["", None])
+def test_empty_trader_data(state_data):
+    assert trader.Trader().deserialize_trader_data(state_data) == {}
+
+
+# jsonpickle warns about its upcoming keys=True default on every encode
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_foreign_and_damaged_payloads():
+    strategy = trader.Trader()
+    encoded = trader.TRADER_DATA_CODEC.encode(sample_trader_data())
+    for payload in (
+        jsonpickle.encode(sample_trader_data()),
+        encoded[:-1],
+        trader.TRADER_DATA_CODEC.prefix + "[1]",
+        trader.TRADER_DATA_CODEC.prefix + '{"AMETHYSTS": null}',
+    ):
+        assert strategy.deserialize_trader_data(payload) == {}, payload